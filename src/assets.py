@@ -0,0 +1,31 @@
+import json, os, posixpath
+
+from sync import list_files
+from writer import write_file
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 10
+
+def fingerprinted_name(site_path, digest, length=FINGERPRINT_LENGTH):
+    # "/images/tom.png" -> "/images/tom.<digest prefix>.png"
+    directory, name = posixpath.split(site_path)
+    stem, extension = posixpath.splitext(name)
+    return posixpath.join(directory, f"{stem}.{digest[:length]}{extension}")
+
+def static_site_path(path, static_dir):
+    # "static/images/tom.png" -> "/images/tom.png"
+    return "/" + os.path.relpath(path, static_dir).replace(os.sep, "/")
+
+def fingerprint_assets(static_dir, hasher):
+    # Site path -> fingerprinted site path for every file in static_dir.
+    # hasher is usually a HashCache so that unchanged files aren't re-read.
+    return {
+        static_site_path(path, static_dir): fingerprinted_name(static_site_path(path, static_dir), hasher(path))
+        for path in list_files(static_dir)
+    }
+
+def write_asset_manifest(dest_dir, assets):
+    # Published with the site so that servers and tooling can map original
+    # asset URLs to the fingerprinted ones
+    data = json.dumps(assets, indent=2, sort_keys=True) + "\n"
+    return write_file(os.path.join(dest_dir, ASSET_MANIFEST_NAME), data.encode())
@@ -0,0 +1,2 @@
+# Performance benchmarks for the site generator. Run with ./bench.sh, see
+# benchmarks/__main__.py for the available commands.
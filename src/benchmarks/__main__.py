@@ -0,0 +1,90 @@
+import argparse, json, sys
+
+from benchmarks.compare import compare_results, corpus_differences, format_comparison, has_regressions
+from benchmarks.corpus import BLOCK_TYPES, generate_corpus, write_site
+from benchmarks.run import format_results, run_benchmarks
+from benchmarks.memory import format_memory, measure_memory
+
+def parse_mix(text):
+    # "paragraph=5,unordered_list=3" -> {"paragraph": 5, "unordered_list": 3}
+    mix = {}
+    for item in text.split(","):
+        block_type, _, weight = item.partition("=")
+        if block_type not in BLOCK_TYPES:
+            raise argparse.ArgumentTypeError(f"unknown block type {block_type!r}, expected one of {', '.join(BLOCK_TYPES)}")
+        mix[block_type] = float(weight or 1)
+    return mix
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--pages", type=int, default=100, help="number of pages to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks-per-page", type=int, default=40)
+    parser.add_argument("--lines-per-block", type=int, default=4)
+    parser.add_argument("--words-per-line", type=int, default=12)
+    parser.add_argument("--inline-density", type=float, default=0.1, help="fraction of words with inline markup")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="block type weights, e.g. paragraph=5,unordered_list=3")
+
+def corpus_options(args):
+    return {
+        "blocks_per_page": args.blocks_per_page,
+        "lines_per_block": args.lines_per_block,
+        "words_per_line": args.words_per_line,
+        "inline_density": args.inline_density,
+        "mix": args.mix,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh", description="Benchmark the static site generator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time each stage on a synthetic corpus")
+    add_corpus_arguments(run_parser)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--only", nargs="+", help="benchmarks to run (default: all)")
+    run_parser.add_argument("-o", "--output", help="write results as JSON to this file")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown as a fraction (default 0.1)")
+    compare_parser.add_argument("--allow-mismatch", action="store_true", help="compare even when the corpus pages, seed or options differ")
+
+    memory_parser = commands.add_parser("memory", help="measure node count and memory for one large parsed document")
+    add_corpus_arguments(memory_parser)
+    memory_parser.add_argument("-o", "--output", help="write results as JSON to this file")
+
+    corpus_parser = commands.add_parser("corpus", help="write a synthetic site to a directory")
+    corpus_parser.add_argument("directory")
+    add_corpus_arguments(corpus_parser)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run_benchmarks(args.pages, args.repeat, args.seed, args.only, **corpus_options(args))
+        print(format_results(results))
+        if args.output:
+            with open(args.output, "w") as output_file:
+                json.dump(results, output_file, indent=2)
+    elif args.command == "compare":
+        with open(args.baseline) as baseline_file, open(args.current) as current_file:
+            baseline, current = json.load(baseline_file), json.load(current_file)
+        differences = corpus_differences(baseline, current)
+        if differences and not args.allow_mismatch:
+            print(f"Not comparing: the corpus differs ({', '.join(differences)}); use --allow-mismatch to compare anyway", file=sys.stderr)
+            return 2
+        if differences:
+            print(f"Warning: the corpus differs ({', '.join(differences)})", file=sys.stderr)
+        rows = compare_results(baseline, current, args.threshold, allow_mismatch=True)
+        print(format_comparison(rows))
+        return 1 if has_regressions(rows) else 0
+    elif args.command == "memory":
+        result = measure_memory(args.pages, args.seed, **corpus_options(args))
+        print(format_memory(result))
+        if args.output:
+            with open(args.output, "w") as output_file:
+                json.dump(result, output_file, indent=2)
+    elif args.command == "corpus":
+        write_site(args.directory, generate_corpus(args.pages, args.seed, **corpus_options(args)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
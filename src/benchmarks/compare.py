@@ -0,0 +1,42 @@
+# Result metadata that defines the corpus; timings are only comparable when
+# all of it matches
+CORPUS_META = ("pages", "seed", "corpus_options")
+
+def corpus_differences(baseline, current):
+    # The CORPUS_META keys whose values differ between two result files
+    baseline_meta, current_meta = baseline.get("meta", {}), current.get("meta", {})
+    return [key for key in CORPUS_META if baseline_meta.get(key) != current_meta.get(key)]
+
+def compare_results(baseline, current, threshold=0.1, allow_mismatch=False):
+    # Compare the median timings of two result files. A benchmark regressed
+    # when it got more than threshold (a fraction) slower than the baseline.
+    # Results for different corpora raise ValueError unless allow_mismatch.
+    differences = corpus_differences(baseline, current)
+    if differences and not allow_mismatch:
+        raise ValueError(f"results were measured on different corpora (differing {', '.join(differences)})")
+    rows = []
+    for name, timing in current["results"].items():
+        if name not in baseline["results"]:
+            rows.append((name, None, timing["median"], None, "new"))
+            continue
+        base = baseline["results"][name]["median"]
+        ratio = timing["median"] / base if base else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, base, timing["median"], ratio, status))
+    return rows
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<24}{'base (ms)':>12}{'current (ms)':>14}{'ratio':>8}  status"]
+    for name, base, current, ratio, status in rows:
+        base_text = "-" if base is None else f"{base * 1000:.2f}"
+        ratio_text = "-" if ratio is None else f"{ratio:.2f}x"
+        lines.append(f"{name:<24}{base_text:>12}{current * 1000:>14.2f}{ratio_text:>8}  {status}")
+    return "\n".join(lines)
+
+def has_regressions(rows):
+    return any(status == "REGRESSION" for *_, status in rows)
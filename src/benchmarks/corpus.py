@@ -0,0 +1,110 @@
+import os, random
+
+BLOCK_TYPES = ("heading", "paragraph", "code", "quote", "unordered_list", "ordered_list")
+DEFAULT_MIX = {
+    "heading": 2,
+    "paragraph": 5,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 2,
+    "ordered_list": 1,
+}
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves dwarves and men received rings of their own and a hobbit "
+    "named frodo carried it across middle earth with his friends"
+).split()
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <title> {{ Title }} </title>
+    <link href="/index.css" rel="stylesheet">
+</head>
+<body>
+    <article>
+        {{ Content }}
+    </article>
+</body>
+</html>
+"""
+
+class CorpusGenerator:
+    # Builds synthetic markdown documents. mix weights the block types and
+    # inline_density is the chance that a word gets inline markup (bold,
+    # italic, code, link or image).
+
+    def __init__(self, seed=0, blocks_per_page=40, words_per_line=12, lines_per_block=4, mix=None, inline_density=0.1):
+        self.rng = random.Random(seed)
+        self.blocks_per_page = blocks_per_page
+        self.words_per_line = words_per_line
+        self.lines_per_block = lines_per_block
+        self.mix = mix if mix is not None else DEFAULT_MIX
+        self.inline_density = inline_density
+
+    def word(self):
+        word = self.rng.choice(WORDS)
+        if self.rng.random() >= self.inline_density:
+            return word
+        match self.rng.randrange(5):
+            case 0:
+                return f"**{word}**"
+            case 1:
+                return f"_{word}_"
+            case 2:
+                return f"`{word}`"
+            case 3:
+                return f"[{word}](/blog/{word})"
+            case _:
+                return f"![{word}](/images/{word}.png)"
+
+    def line(self):
+        return " ".join(self.word() for _ in range(self.words_per_line))
+
+    def block(self, block_type):
+        lines = range(self.lines_per_block)
+        match block_type:
+            case "heading":
+                return "#" * self.rng.randint(2, 6) + " " + self.line()
+            case "paragraph":
+                return "\n".join(self.line() for _ in lines)
+            case "code":
+                code = "\n".join(" ".join(self.rng.choice(WORDS) for _ in range(self.words_per_line)) for _ in lines)
+                return f"```\n{code}\n```"
+            case "quote":
+                return "\n".join("> " + self.line() for _ in lines)
+            case "unordered_list":
+                return "\n".join("- " + self.line() for _ in lines)
+            case "ordered_list":
+                return "\n".join(f"{num}. " + self.line() for num in range(1, self.lines_per_block + 1))
+            case _:
+                raise ValueError(f"Unknown block type: {block_type}")
+
+    def page(self, title="Synthetic page"):
+        types = list(self.mix)
+        weights = [self.mix[block_type] for block_type in types]
+        blocks = [f"# {title}"]
+        blocks.extend(self.block(block_type) for block_type in self.rng.choices(types, weights, k=self.blocks_per_page))
+        return "\n\n".join(blocks) + "\n"
+
+def generate_corpus(pages=100, seed=0, **options):
+    generator = CorpusGenerator(seed, **options)
+    corpus = {}
+    for num in range(pages):
+        # A few pages per directory, like a blog
+        corpus[os.path.join("blog", f"post{num // 10}", f"page{num}.md")] = generator.page(f"Page {num}")
+    return corpus
+
+def write_site(root, corpus):
+    # Lay out a buildable site (content/, static/, template.html) under root
+    for relative_path, markdown in corpus.items():
+        path = os.path.join(root, "content", relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as markdown_file:
+            markdown_file.write(markdown)
+    os.makedirs(os.path.join(root, "static"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as css_file:
+        css_file.write("body { margin: 0; }\n")
+    with open(os.path.join(root, "template.html"), "w") as template_file:
+        template_file.write(TEMPLATE)
@@ -0,0 +1,45 @@
+import gc, resource, sys, tracemalloc
+
+from htmlnode import ParentNode
+from util import markdown_to_html_node, text_to_textnodes, markdown_to_blocks
+from benchmarks.corpus import generate_corpus
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    return count
+
+def peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def measure_memory(pages=200, seed=0, **corpus_options):
+    # Parse one large document built from the whole corpus and keep every
+    # tree alive, as the dev server and pool workers do
+    document = "\n\n".join(generate_corpus(pages, seed, **corpus_options).values())
+    gc.collect()
+    tracemalloc.start()
+    tree = markdown_to_html_node(document)
+    text_nodes = [text_to_textnodes(block) for block in markdown_to_blocks(document)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    html_nodes = count_nodes(tree)
+    text_node_count = sum(len(nodes) for nodes in text_nodes)
+    return {
+        "document_bytes": len(document.encode()),
+        "html_nodes": html_nodes,
+        "text_nodes": text_node_count,
+        "retained_bytes": current,
+        "peak_traced_bytes": peak,
+        "bytes_per_node": current / (html_nodes + text_node_count),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+def format_memory(result):
+    return "\n".join(f"{name:<20}{value:>16,.0f}" for name, value in result.items())
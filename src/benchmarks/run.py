@@ -0,0 +1,77 @@
+import contextlib, io, os, platform, statistics, tempfile, time
+
+import main
+from util import block_to_block_type, markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+from benchmarks.corpus import generate_corpus, write_site
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def summarize(timings):
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": len(timings),
+    }
+
+def build_site(root):
+    # main() works relative to the current directory and prints progress.
+    # --clean doesn't clear the parse and highlight caches, so they are
+    # turned off to time a cold build on every repeat
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.main(["/", "--clean", "--no-parse-cache", "--no-highlight-cache"])
+    finally:
+        os.chdir(cwd)
+
+def run_benchmarks(pages=100, repeat=5, seed=0, only=None, **corpus_options):
+    corpus = generate_corpus(pages, seed, **corpus_options)
+    documents = list(corpus.values())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    paragraphs = [block for block in blocks if block_to_block_type(block) == "paragraph"]
+    trees = [markdown_to_html_node(document) for document in documents]
+
+    benchmarks = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(document) for document in documents],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(paragraph) for paragraph in paragraphs],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(document) for document in documents],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+    }
+    results = {}
+    for name, func in benchmarks.items():
+        if only is None or name in only:
+            results[name] = summarize(time_call(func, repeat))
+
+    if only is None or "build" in only:
+        with tempfile.TemporaryDirectory() as root:
+            write_site(root, corpus)
+            results["build"] = summarize(time_call(lambda: build_site(root), repeat))
+
+    return {
+        "meta": {
+            "pages": pages,
+            "seed": seed,
+            "repeat": repeat,
+            "corpus_options": corpus_options,
+            "corpus_bytes": sum(len(document.encode()) for document in documents),
+            "blocks": len(blocks),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def format_results(results):
+    lines = [f"{'benchmark':<24}{'min (ms)':>12}{'median (ms)':>14}"]
+    for name, timing in results["results"].items():
+        lines.append(f"{name:<24}{timing['min'] * 1000:>12.2f}{timing['median'] * 1000:>14.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import time
+
+from document import parse_blocks
+from filesystem import DiskFS
+from profiler import NULL_PROFILE
+from template import Template
+from urls import BasepathResolver
+from util import markdown_to_blocks
+
+class SiteConfig:
+    # Where build_site finds the site's parts, relative to the filesystem
+    # root. Defaults match the repository layout used by main.py.
+
+    def __init__(self, content="content", static="static", template="template.html", output="docs", basepath="/", exclude=None):
+        self.content = content
+        self.static = static
+        self.template = template
+        self.output = output
+        self.basepath = basepath
+        self.exclude = list(exclude) if exclude is not None else []
+
+    def __repr__(self):
+        return f"SiteConfig({self.content}, {self.static}, {self.template}, {self.output}, {self.basepath})"
+
+class BuildResult:
+    # pages maps output paths ("docs/blog/index.html") to their rendered
+    # HTML; static lists the output paths of the copied static files.
+
+    def __init__(self, pages, static, stats):
+        self.pages = pages
+        self.static = static
+        self.stats = stats
+
+    def __repr__(self):
+        return f"BuildResult({len(self.pages)} pages, {len(self.static)} static files)"
+
+def site_config(config=None):
+    # config may be a SiteConfig, a dict of its arguments or None for the defaults
+    if config is None:
+        return SiteConfig()
+    if isinstance(config, dict):
+        return SiteConfig(**config)
+    return config
+
+def page_output_path(config, relative_path):
+    return f"{config.output}/{relative_path.removesuffix('.md')}.html"
+
+# The steps of building a page, shared with main.generate_page, which adds
+# the parse cache, dependency and search recording and writing to disk
+
+def parse_page(markdown, source_path, profile=NULL_PROFILE, parse_cache=None, source_hash=None, highlight_cache=None):
+    # parse_cache (a cache.ParseCache) is keyed by source_hash, the hash of
+    # markdown, and is only used when both are given
+    document = None
+    if parse_cache is not None and source_hash is not None:
+        document = parse_cache.get(source_hash)
+    if document is None:
+        with profile.phase("block_split"):
+            blocks = markdown_to_blocks(markdown)
+        with profile.phase("inline_parse"):
+            document = parse_blocks(blocks, highlight_cache)
+        if parse_cache is not None and source_hash is not None:
+            parse_cache.put(source_hash, document)
+    if document.title is None:
+        raise Exception(f"A title cannot be found in {source_path}")
+    return document
+
+def render_chunks(template, document, resolve_url):
+    # The page's HTML as it is rendered, for streaming it to a file
+    return template.iter_render(Title=document.title, Content=document.root.iter_html(resolve_url))
+
+def render_page(template, document, resolve_url, profile=NULL_PROFILE):
+    with profile.phase("render"):
+        return "".join(render_chunks(template, document, resolve_url))
+
+def build_site(config=None, fs=None, profile=NULL_PROFILE, highlight_cache=None):
+    # Build the whole site in-process: copy static files and render every
+    # page into config.output on fs (DiskFS(".") by default, or a MemoryFS).
+    # config may be a SiteConfig or a dict of its arguments. Unlike the CLI
+    # build this keeps no manifest or parse cache and always renders every
+    # page; highlight_cache (a cache.HighlightCache) is used when given.
+    config = site_config(config)
+    if fs is None:
+        fs = DiskFS()
+    started = time.perf_counter()
+    resolve_url = BasepathResolver(config.basepath)
+    template = Template(fs.read_text(config.template), resolve_url)
+
+    static = []
+    with profile.phase("static_copy"):
+        for relative_path in fs.iter_files(config.static):
+            destination = f"{config.output}/{relative_path}"
+            fs.copy(f"{config.static}/{relative_path}", destination)
+            static.append(destination)
+
+    pages = {}
+    bytes_in = 0
+    for relative_path in profile.iterate("walk", fs.iter_files(config.content, include=("*.md",), exclude=config.exclude)):
+        source_path = f"{config.content}/{relative_path}"
+        with profile.phase("read"):
+            markdown = fs.read_text(source_path)
+        document = parse_page(markdown, source_path, profile, highlight_cache=highlight_cache)
+        html = render_page(template, document, resolve_url, profile)
+        destination = page_output_path(config, relative_path)
+        with profile.phase("write"):
+            fs.write_text(destination, html)
+        pages[destination] = html
+        bytes_in += len(markdown.encode())
+
+    stats = {
+        "pages": len(pages),
+        "static_files": len(static),
+        "bytes_in": bytes_in,
+        "bytes_out": sum(len(html.encode()) for html in pages.values()),
+        "seconds": time.perf_counter() - started,
+    }
+    return BuildResult(pages, static, stats)
@@ -0,0 +1,150 @@
+import hashlib, marshal, os, threading, zlib
+
+from htmlnode import LeafNode, ParentNode
+from document import Document
+from util import PARSER_VERSION
+from highlight import HIGHLIGHT_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_HIGHLIGHT_MAX_BYTES = 16 * 1024 * 1024
+# Bumped whenever serialize_document's layout changes
+CACHE_FORMAT = 2
+
+def node_to_data(node):
+    if isinstance(node, ParentNode):
+        return (1, node.tag, [node_to_data(child) for child in node.children], node.props)
+    return (0, node.tag, node.value, node.props)
+
+def data_to_node(data):
+    kind, tag, value, props = data
+    if kind == 1:
+        return ParentNode(tag, [data_to_node(child) for child in value], props)
+    return LeafNode(tag, value, props)
+
+def serialize_document(document):
+    # Nested tuples of builtins through marshal, compressed: far smaller and
+    # faster to load than pickling every node object
+    data = (document.title, node_to_data(document.root), document.headings, document.links, document.images, document.text)
+    return zlib.compress(marshal.dumps(data), 1)
+
+def deserialize_document(payload):
+    title, root, headings, links, images, text = marshal.loads(zlib.decompress(payload))
+    return Document(title, data_to_node(root), headings, links, images, text)
+
+class DiskCache:
+    # Entries stored one file each under directory, in subdirectories named
+    # by the first two characters of their key. An entry's mtime is its last
+    # use, and trim() evicts the least recently used entries over max_bytes.
+    # Subclasses decide the keys and the format of the entries.
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def read(self, path):
+        # The entry's bytes, or None when it is missing
+        try:
+            with open(path, "rb") as cache_file:
+                data = cache_file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per thread as well, for the render server's threads
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(data)
+        os.replace(temp_path, path)
+
+    def entries(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for prefix in os.listdir(self.directory):
+            prefix_path = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_path):
+                continue
+            for name in os.listdir(prefix_path):
+                path = os.path.join(prefix_path, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def trim(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed, total
+
+class ParseCache(DiskCache):
+    # On-disk cache of parsed Documents keyed by the source hash. Entries are
+    # invalidated by bumping util.PARSER_VERSION, highlight.HIGHLIGHT_VERSION
+    # or CACHE_FORMAT (or by a Python upgrade changing the marshal format).
+
+    def path(self, source_hash):
+        return self.key_path(hashlib.sha256(f"{PARSER_VERSION}:{HIGHLIGHT_VERSION}:{CACHE_FORMAT}:{marshal.version}:{source_hash}".encode()).hexdigest())
+
+    def get(self, source_hash):
+        try:
+            data = self.read(self.path(source_hash))
+            document = None if data is None else deserialize_document(data)
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            # Corrupt or unreadable entry: treat as a miss, it gets rewritten
+            document = None
+        if document is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return document
+
+    def put(self, source_hash, document):
+        self.write(self.path(source_hash), serialize_document(document))
+
+    def stats(self):
+        return f"Parse cache: {self.hits} hits, {self.misses} misses"
+
+class HighlightCache(DiskCache):
+    # On-disk cache of highlighted code blocks keyed by the language and the
+    # hash of the code, so a snippet shared by several pages, or left alone
+    # when its page changes, is only tokenized once. Entries are the
+    # highlighted HTML as UTF-8 and are invalidated by bumping
+    # highlight.HIGHLIGHT_VERSION.
+
+    def __init__(self, directory, max_bytes=DEFAULT_HIGHLIGHT_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def path(self, language, code):
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        return self.key_path(hashlib.sha256(f"{HIGHLIGHT_VERSION}:{language}:{code_hash}".encode()).hexdigest())
+
+    def get(self, language, code):
+        try:
+            data = self.read(self.path(language, code))
+            html = None if data is None else data.decode()
+        except (OSError, UnicodeDecodeError):
+            html = None
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, language, code, html):
+        self.write(self.path(language, code), html.encode())
+
+    def stats(self):
+        return f"Highlight cache: {self.hits} hits, {self.misses} misses"
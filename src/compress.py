@@ -0,0 +1,80 @@
+import gzip, os
+from concurrent.futures import ProcessPoolExecutor
+
+from writer import write_file
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".svg")
+DEFAULT_MIN_SIZE = 1024
+
+def sidecar_path(path):
+    return path + ".gz"
+
+def is_sidecar_current(path):
+    # gzip_file gives the sidecar its file's exact mtime. Any other mtime
+    # means the file changed, even when the new one is older (cp -p, rsync
+    # -a and archive extraction all keep the original mtime).
+    try:
+        return os.stat(sidecar_path(path)).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def gzip_file(path, level=9):
+    # mtime=0 keeps the sidecar byte-identical for identical input. The
+    # file is stat'ed before it is read, so a change made while compressing
+    # leaves the sidecar out of date rather than marked current.
+    mtime_ns = os.stat(path).st_mtime_ns
+    with open(path, "rb") as source_file:
+        data = source_file.read()
+    write_file(sidecar_path(path), gzip.compress(data, compresslevel=level, mtime=0))
+    # write_file leaves an identical sidecar alone, so set its mtime either way
+    os.utime(sidecar_path(path), ns=(mtime_ns, mtime_ns))
+    return path
+
+def find_compressible(directory, min_size=DEFAULT_MIN_SIZE):
+    # (files to compress, sidecars without a compressible file next to them)
+    files, orphans = [], []
+    for root, _, names in os.walk(directory):
+        names = set(names)
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                if os.path.getsize(path) >= min_size:
+                    files.append(path)
+                elif name + ".gz" in names:
+                    orphans.append(sidecar_path(path))
+            elif name.endswith(".gz") and name[:-3].endswith(COMPRESSIBLE_EXTENSIONS) and name[:-3] not in names:
+                orphans.append(path)
+    return sorted(files), sorted(orphans)
+
+def compress_outputs(directory, min_size=DEFAULT_MIN_SIZE, level=9, jobs=None, verbose=False):
+    # Write a .gz sidecar for every HTML, CSS and SVG file in directory of at
+    # least min_size bytes, on a process pool since compression is CPU bound.
+    # Sidecars with their file's mtime are kept; ones that are no longer
+    # wanted are removed. Returns (compressed, skipped, removed).
+    files, orphans = find_compressible(directory, min_size)
+    pending, skipped = [], []
+    for path in files:
+        (skipped if is_sidecar_current(path) else pending).append(path)
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            compressed = list(executor.map(gzip_file, pending, [level] * len(pending), chunksize=8))
+    else:
+        compressed = [gzip_file(path, level) for path in pending]
+    for path in orphans:
+        os.remove(path)
+    if verbose: print(f"Gzip sidecars: {len(compressed)} written, {len(skipped)} unchanged, {len(orphans)} removed")
+    return compressed, skipped, orphans
+
+def remove_stale_sidecars(directory, verbose=False):
+    # For builds without compression: sidecars whose file changed or is gone
+    # are removed, so that none is served with outdated content. Current
+    # ones are left for the next compressing build. Returns the removed paths.
+    removed = []
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if name.endswith(".gz") and name[:-3].endswith(COMPRESSIBLE_EXTENSIONS) and not is_sidecar_current(os.path.join(root, name[:-3])):
+                removed.append(os.path.join(root, name))
+    for path in removed:
+        os.remove(path)
+    if verbose and removed: print(f"Gzip sidecars: {len(removed)} stale removed")
+    return sorted(removed)
@@ -0,0 +1,117 @@
+import json, os, posixpath
+from urllib.parse import urlsplit
+
+from manifest import write_json
+
+DEPS_VERSION = 2
+
+def page_url(dest_path, dest_dir):
+    # "docs/blog/tom/index.html" -> "/blog/tom/index.html"
+    return "/" + os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+
+def local_site_path(url, from_url):
+    # Site path ("/images/a.png") a URL on the page at from_url points to, or
+    # None for external, protocol-relative and fragment-only URLs
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = parts.path if parts.path.startswith("/") else posixpath.join(posixpath.dirname(from_url), parts.path)
+    return posixpath.normpath(path)
+
+def find_source(site_path, content_dir, static_dir):
+    # Map a site path to the file it is built from: ("asset", static file)
+    # or ("link", markdown page), or None when nothing local matches
+    relative = site_path.lstrip("/")
+    static_path = os.path.join(static_dir, *relative.split("/"))
+    if relative and os.path.isfile(static_path):
+        return "asset", static_path
+    page_path = os.path.join(content_dir, *relative.split("/")) if relative else content_dir
+    for candidate in (page_path + ".md", os.path.join(page_path, "index.md")):
+        if os.path.isfile(candidate):
+            return "link", candidate
+    return None
+
+class DependencyGraph:
+    # Maps each page source to what its output is built from: the template
+    # and the static files its links and images point to ("assets"), plus the
+    # local pages it links to ("links"). A linked page's content doesn't end
+    # up in the output, so links are recorded for tooling but are not
+    # followed when deciding what to rebuild. "references" keeps every local
+    # site path the page refers to, including ones nothing matched yet, so
+    # that a static file added later can still be traced back to the page.
+
+    def __init__(self, path=None, pages=None, content_dir="content", static_dir="static", dest_dir="docs"):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+
+    @classmethod
+    def load(cls, path, **layout):
+        try:
+            with open(path, "r") as deps_file:
+                data = json.load(deps_file)
+        except (OSError, ValueError):
+            return cls(path, **layout)
+        if not isinstance(data, dict) or data.get("version") != DEPS_VERSION:
+            return cls(path, **layout)
+        return cls(path, data.get("pages", {}), **layout)
+
+    def fork(self):
+        # Empty graph with the same layout, for recording in a worker process
+        return DependencyGraph(None, None, self.content_dir, self.static_dir, self.dest_dir)
+
+    def record_page(self, source_path, dest_path, template_path, urls):
+        from_url = page_url(dest_path, self.dest_dir)
+        targets = {"asset": set(), "link": set()}
+        references = set()
+        for url in urls:
+            site_path = local_site_path(url, from_url)
+            if site_path is None:
+                continue
+            references.add(site_path)
+            found = find_source(site_path, self.content_dir, self.static_dir)
+            if found is not None and found[1] != source_path:
+                targets[found[0]].add(found[1])
+        self.pages[source_path] = {"template": template_path, "assets": sorted(targets["asset"]), "links": sorted(targets["link"]),
+                                   "references": sorted(references)}
+
+    def merge(self, pages):
+        self.pages.update(pages)
+
+    def prune(self, sources):
+        # Forget pages whose source wasn't part of this build (deleted or
+        # excluded); sources are the ones the build walked
+        for source_path in [source_path for source_path in self.pages if source_path not in sources]:
+            del self.pages[source_path]
+
+    def dependencies(self, source_path):
+        entry = self.pages.get(source_path)
+        if entry is None:
+            return []
+        return [entry["template"]] + entry["assets"] + entry["links"]
+
+    def affected(self, changed_paths):
+        # Sources of the pages whose output may differ after changed_paths
+        # changed. Paths are compared after normalization.
+        changed = {os.path.normpath(path) for path in changed_paths}
+        affected = set()
+        for source_path, entry in self.pages.items():
+            inputs = [source_path, entry["template"]] + entry["assets"]
+            if any(os.path.normpath(path) in changed for path in inputs):
+                affected.add(source_path)
+        return sorted(affected)
+
+    def dependents(self, path):
+        # Pages that depend on path in any way, including by linking to it
+        path = os.path.normpath(path)
+        return sorted(
+            source_path for source_path in self.pages
+            if path in (os.path.normpath(dependency) for dependency in self.dependencies(source_path))
+        )
+
+    def save(self):
+        if self.path is None:
+            return
+        write_json(self.path, {"version": DEPS_VERSION, "pages": self.pages})
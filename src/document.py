@@ -0,0 +1,88 @@
+from textnode import TextType
+from htmlnode import ParentNode
+from util import BLOCK_TO_HTML_NODE_FUNCS, classify_block, markdown_to_blocks
+
+class Document:
+    # Everything the build needs from one markdown source, collected while
+    # the HTML tree is built: the title (first "# " heading), every heading
+    # as (level, text), the links and images as (text, url) pairs, and the
+    # plain text of each inline run in order (for the search index; image alt
+    # text and code blocks are not included).
+
+    def __init__(self, title=None, root=None, headings=None, links=None, images=None, text=None):
+        self.title = title
+        self.root = root
+        self.headings = headings if headings is not None else []
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+        self.text = text if text is not None else []
+
+    def add_text_nodes(self, text_nodes):
+        for text_node in text_nodes:
+            if text_node.text_type == TextType.LINK:
+                self.links.append((text_node.text, text_node.url))
+            elif text_node.text_type == TextType.IMAGE:
+                self.images.append((text_node.text, text_node.url))
+        text = "".join(text_node.text for text_node in text_nodes if text_node.text_type != TextType.IMAGE)
+        if text:
+            self.text.append(text)
+
+    def add_heading(self, block, node):
+        text = "".join(child.value for child in node.children)
+        self.headings.append((int(node.tag[1:]), text))
+        if self.title is None and block.startswith("# "):
+            self.title = block[2:].strip()
+
+    def __repr__(self):
+        return f"Document({self.title}, {len(self.headings)} headings, {len(self.links)} links, {len(self.images)} images)"
+
+def parse_blocks(markdown_blocks, highlight_cache=None):
+    document = Document()
+    children = []
+    for markdown_block in markdown_blocks:
+        block_type, lines = classify_block(markdown_block)
+        node = BLOCK_TO_HTML_NODE_FUNCS[block_type](markdown_block, lines, document.add_text_nodes, highlight_cache)
+        if block_type == "heading":
+            document.add_heading(markdown_block, node)
+        children.append(node)
+    document.root = ParentNode("div", children)
+    return document
+
+def parse_document(markdown: str, highlight_cache=None):
+    return parse_blocks(markdown_to_blocks(markdown), highlight_cache)
+
+def stream_document(markdown_blocks, resolve_url=None, document=None, highlight_cache=None):
+    # Render blocks as they arrive instead of building the whole tree. Only
+    # the blocks up to and including the title are held, since the title is
+    # needed before the content. Returns (title, chunks); the chunks are the
+    # same as parse_blocks(...).root.iter_html(resolve_url). When given, the
+    # document's headings, links and images fill in as the chunks are read
+    # (its root stays None).
+    markdown_blocks = iter(markdown_blocks)
+    on_text_nodes = None if document is None else document.add_text_nodes
+
+    def block_to_node(markdown_block):
+        block_type, lines = classify_block(markdown_block)
+        node = BLOCK_TO_HTML_NODE_FUNCS[block_type](markdown_block, lines, on_text_nodes, highlight_cache)
+        if block_type == "heading" and document is not None:
+            document.add_heading(markdown_block, node)
+        return block_type, node
+
+    title = None
+    head = []
+    for markdown_block in markdown_blocks:
+        block_type, node = block_to_node(markdown_block)
+        head.append(node)
+        if block_type == "heading" and markdown_block.startswith("# "):
+            title = markdown_block[2:].strip()
+            break
+
+    def chunks():
+        yield "<div>"
+        for node in head:
+            yield from node.iter_html(resolve_url)
+        for markdown_block in markdown_blocks:
+            yield from block_to_node(markdown_block)[1].iter_html(resolve_url)
+        yield "</div>"
+
+    return title, chunks()
@@ -0,0 +1,88 @@
+import os, posixpath, shutil
+
+from sync import is_unchanged
+from walk import matches, walk_files
+from writer import write_file
+
+# Filesystem backends for builder.build_site. Paths are relative to the
+# backend's root and use "/" as the separator.
+
+class DiskFS:
+    # Files under root on disk. Writes are atomic and leave identical files
+    # untouched, and copies skip files that are unchanged since the last
+    # one, like the CLI build's.
+
+    def __init__(self, root="."):
+        self.root = root
+
+    def path(self, path):
+        return os.path.join(self.root, *path.split("/"))
+
+    def read_bytes(self, path):
+        with open(self.path(path), "rb") as f:
+            return f.read()
+
+    def read_text(self, path):
+        with open(self.path(path), "r") as f:
+            return f.read()
+
+    def write_text(self, path, text):
+        os.makedirs(os.path.dirname(self.path(path)), exist_ok=True)
+        write_file(self.path(path), text.encode())
+
+    def copy(self, source, destination):
+        # Returns whether the file was copied
+        if is_unchanged(self.path(source), self.path(destination)):
+            return False
+        os.makedirs(os.path.dirname(self.path(destination)), exist_ok=True)
+        shutil.copy2(self.path(source), self.path(destination))
+        return True
+
+    def iter_files(self, directory, include=None, exclude=None):
+        for relative_path, _ in walk_files(self.path(directory), include, exclude):
+            yield relative_path
+
+    def __repr__(self):
+        return f"DiskFS({self.root})"
+
+class MemoryFS:
+    # Files held in a dict of path -> str or bytes, e.g. for rendering a CMS
+    # preview or in tests without touching the disk. Directories are implied
+    # by the paths of the files in them.
+
+    def __init__(self, files=None):
+        self.files = {}
+        for path, data in (files or {}).items():
+            self.files[self.normalize(path)] = data
+
+    def normalize(self, path):
+        return posixpath.normpath(path).lstrip("/")
+
+    def read_bytes(self, path):
+        data = self.files[self.normalize(path)]
+        return data.encode() if isinstance(data, str) else data
+
+    def read_text(self, path):
+        data = self.files[self.normalize(path)]
+        return data.decode() if isinstance(data, bytes) else data
+
+    def write_text(self, path, text):
+        self.files[self.normalize(path)] = text
+
+    def copy(self, source, destination):
+        self.files[self.normalize(destination)] = self.files[self.normalize(source)]
+        return True
+
+    def iter_files(self, directory, include=None, exclude=None):
+        # Same order and glob semantics as walk.walk_files
+        prefix = self.normalize(directory) + "/"
+        relative_paths = sorted((path[len(prefix):] for path in self.files if path.startswith(prefix)), key=lambda path: path.split("/"))
+        for relative_path in relative_paths:
+            parts = relative_path.split("/")
+            if exclude and any(matches("/".join(parts[:i]), parts[i - 1], exclude) for i in range(1, len(parts) + 1)):
+                continue
+            if include is None or matches(relative_path, parts[-1], include):
+                yield relative_path
+
+    def __repr__(self):
+        return f"MemoryFS({len(self.files)} files)"
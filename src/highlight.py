@@ -0,0 +1,131 @@
+import html, re
+
+# Bump whenever highlighted output for the same code changes; cached
+# results from older versions are ignored
+HIGHLIGHT_VERSION = 1
+
+# Token types are rendered as <span class="hl-{type}">; "name" tokens are
+# matched only so that keywords and string prefixes inside identifiers are
+# skipped, and are left unwrapped
+PLAIN_TOKENS = ("name",)
+
+def compile_lexer(rules):
+    # rules is a list of (token type, pattern), tried in order at each position
+    return re.compile("|".join(f"(?P<{token_type}>{pattern})" for token_type, pattern in rules), re.MULTILINE)
+
+def words(*names):
+    return r"\b(?:" + "|".join(names) + r")\b"
+
+DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+NUMBER = r"\b0[xX][0-9a-fA-F_]+\b|\b\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?\b"
+BLOCK_COMMENT = r"/\*[\s\S]*?\*/"
+
+LEXERS = {
+    "python": compile_lexer([
+        ("comment", r"#[^\n]*"),
+        ("string", r"(?:\b[rbfuRBFU]{1,2})?(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|" + DOUBLE_QUOTED + "|" + SINGLE_QUOTED + ")"),
+        ("number", NUMBER),
+        ("keyword", words("False", "None", "True", "and", "as", "assert", "async", "await", "break", "class", "continue",
+                          "def", "del", "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in",
+                          "is", "lambda", "match", "case", "nonlocal", "not", "or", "pass", "raise", "return", "try",
+                          "while", "with", "yield")),
+        ("builtin", words("print", "len", "range", "open", "str", "int", "float", "bool", "list", "dict", "set", "tuple",
+                          "isinstance", "enumerate", "zip", "map", "filter", "sorted", "super", "self", "Exception")),
+        ("name", r"[A-Za-z_]\w*"),
+    ]),
+    "javascript": compile_lexer([
+        ("comment", r"//[^\n]*|" + BLOCK_COMMENT),
+        ("string", DOUBLE_QUOTED + "|" + SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+        ("number", NUMBER),
+        ("keyword", words("async", "await", "break", "case", "catch", "class", "const", "continue", "default", "delete",
+                          "do", "else", "export", "extends", "false", "finally", "for", "function", "if", "import", "in",
+                          "instanceof", "let", "new", "null", "of", "return", "switch", "this", "throw", "true", "try",
+                          "typeof", "undefined", "var", "while", "yield")),
+        ("builtin", words("console", "document", "window", "Math", "JSON", "Object", "Array", "Promise", "fetch")),
+        ("name", r"[A-Za-z_$][\w$]*"),
+    ]),
+    "bash": compile_lexer([
+        ("comment", r"(?<!\S)#[^\n]*"),
+        ("string", DOUBLE_QUOTED + "|" + r"'[^']*'"),
+        ("variable", r"\$\{[^}\n]*\}|\$\w+"),
+        ("keyword", words("if", "then", "else", "elif", "fi", "for", "do", "done", "while", "until", "case", "esac",
+                          "function", "in", "return", "export", "local")),
+        ("builtin", words("echo", "cd", "ls", "cat", "grep", "sed", "cp", "mv", "rm", "mkdir", "python3", "git")),
+        ("name", r"[A-Za-z_][\w-]*"),
+    ]),
+    "json": compile_lexer([
+        ("attribute", DOUBLE_QUOTED + r"(?=\s*:)"),
+        ("string", DOUBLE_QUOTED),
+        ("number", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+        ("keyword", words("true", "false", "null")),
+    ]),
+    "css": compile_lexer([
+        ("comment", BLOCK_COMMENT),
+        ("string", DOUBLE_QUOTED + "|" + SINGLE_QUOTED),
+        ("keyword", r"@[\w-]+|!important"),
+        ("attribute", r"[\w-]+(?=\s*:[^:{]*[;}])"),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:%|[a-z]+\b)?"),
+    ]),
+    "html": compile_lexer([
+        ("comment", r"<!--[\s\S]*?-->"),
+        ("tag", r"</?[A-Za-z][\w:-]*|/?>"),
+        ("attribute", r"[\w:-]+(?==)"),
+        ("string", r'"[^"]*"|' + r"'[^']*'"),
+    ]),
+}
+
+ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "mjs": "javascript",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "htm": "html",
+    "xml": "html",
+}
+
+def canonical_language(language):
+    language = language.lower()
+    return ALIASES.get(language, language)
+
+def tokenize(code, lexer):
+    # Yield (token type or None, text) covering all of code
+    position = 0
+    for match in lexer.finditer(code):
+        if match.start() > position:
+            yield None, code[position:match.start()]
+        token_type = match.lastgroup
+        yield None if token_type in PLAIN_TOKENS else token_type, match.group()
+        position = match.end()
+    if position < len(code):
+        yield None, code[position:]
+
+def tokens_to_html(tokens):
+    # Unlike the rest of the output the code is escaped here, since it is
+    # mixed with real markup
+    chunks = []
+    for token_type, text in tokens:
+        text = html.escape(text, quote=False)
+        chunks.append(text if token_type is None else f'<span class="hl-{token_type}">{text}</span>')
+    return "".join(chunks)
+
+def highlight(code, language, cache=None):
+    # Highlighted HTML for the body of a <code> element, or None when there
+    # is no lexer for language. cache is anything with get(language, code)
+    # and put(language, code, html), e.g. cache.HighlightCache, so that a
+    # snippet is only tokenized once across pages and builds.
+    language = canonical_language(language)
+    lexer = LEXERS.get(language)
+    if lexer is None:
+        return None
+    if cache is not None:
+        cached = cache.get(language, code)
+        if cached is not None:
+            return cached
+    result = tokens_to_html(tokenize(code, lexer))
+    if cache is not None:
+        cache.put(language, code, result)
+    return result
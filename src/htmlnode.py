@@ -1,4 +1,9 @@
+from urls import URL_ATTRIBUTES
+
 class HTMLNode:
+    # __slots__ avoids a per-instance __dict__; props stays None unless a
+    # node actually has attributes
+    __slots__ = ("tag", "value", "children", "props")
 
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -6,52 +11,78 @@ class HTMLNode:
         self.children = children
         self.props = props
 
-    def to_html(self):
+    # resolve_url, when given, is called with the value of every href/src
+    # attribute as it is rendered (e.g. urls.BasepathResolver)
+
+    def to_html(self, resolve_url=None):
+        return "".join(self.iter_html(resolve_url))
+
+    def iter_html(self, resolve_url=None):
         raise NotImplementedError
+
+    def write_html(self, out, resolve_url=None):
+        # Stream the rendered chunks into a file-like object instead of
+        # building the whole document as one string
+        out.writelines(self.iter_html(resolve_url))
     
-    def props_to_html(self):
+    def props_to_html(self, resolve_url=None):
         attr = ""
         if self.props:
             for k in self.props:
-                attr += f' {k}="{self.props[k]}"'
+                value = self.props[k]
+                if resolve_url is not None and k in URL_ATTRIBUTES:
+                    value = resolve_url(value)
+                attr += f' {k}="{value}"'
         return attr
     
     def __repr__(self):
         return f'HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})'
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
 
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError
         super().__init__(tag, value, None, props)
     
-    def to_html(self):
+    def to_html(self, resolve_url=None):
         if self.value is None:
             raise ValueError
         if self.tag is None:
             return self.value
-        prop_text = self.props_to_html()
+        prop_text = self.props_to_html(resolve_url)
         return f"<{self.tag}{prop_text}>{self.value}</{self.tag}>"
+
+    def iter_html(self, resolve_url=None):
+        yield self.to_html(resolve_url)
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
 
     def __init__(self, tag, children, props=None):
         if children is None:
             raise ValueError
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("Tag required")
-        if self.children is None:
-            raise ValueError("List of HTMLNode children required")
-        
-        html = f"<{self.tag}>"
-
-        child: HTMLNode
-        for child in self.children:
-            html += child.to_html()
-        html += f"</{self.tag}>"
-        return html
-        
\ No newline at end of file
+    def iter_html(self, resolve_url=None):
+        # Walk the tree with an explicit stack so every chunk is yielded once,
+        # rather than being re-concatenated at each level of nesting.
+        # Closing tags are pushed as plain strings.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                if node.tag is None:
+                    raise ValueError("Tag required")
+                if node.children is None:
+                    raise ValueError("List of HTMLNode children required")
+                yield f"<{node.tag}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            elif isinstance(node, LeafNode):
+                yield node.to_html(resolve_url)
+            else:
+                yield from node.iter_html(resolve_url)
@@ -1,59 +1,491 @@
-import os, shutil
+import argparse, contextlib, io, json, os, shutil, time
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from textnode import TextNode, TextType
-from util import extract_title, markdown_to_html_node
+from highlight import HIGHLIGHT_VERSION
+from util import PARSER_VERSION, iter_markdown_blocks
+from document import Document, stream_document
+from builder import SiteConfig, parse_page, render_chunks, site_config
+from deps import DependencyGraph
+from search import SearchIndex
+from manifest import BuildManifest, HashCache, hash_bytes, hash_file, write_json
+from assets import ASSET_MANIFEST_NAME, fingerprint_assets, write_asset_manifest
+from cache import HighlightCache, ParseCache
+from template import URL_ATTRIBUTE_PATTERN, Template
+from urls import AssetResolver, BasepathResolver
+from sync import sync_static
+from server import serve
+from render_server import RenderService, serve_render
+from profiler import NULL_PROFILE, BuildProfile
+from walk import walk_files
+from writer import OutputWriter, commit_temp, write_chunks, write_temp
+from outputs import OutputState
+from compress import DEFAULT_MIN_SIZE, compress_outputs, remove_stale_sidecars
 
-def copy_source_destination(source="static", destination="public", verbose=False):
-    if verbose: print(f"Copying {source} to {destination}")
-    if os.path.exists(destination):
-        shutil.rmtree(destination)
-    os.mkdir(destination)
-    
-    for item in os.listdir(source):
-        item_path_source = os.path.join(source, item)
-        item_path_destination = os.path.join(destination, item)
-        if os.path.isfile(item_path_source):
-            if verbose: print(f"Copying {item_path_source} to {item_path_destination}")
-            shutil.copy(item_path_source, item_path_destination)
-        else:
-            copy_source_destination(item_path_source, item_path_destination, verbose)
+CACHE_DIR = ".cache"
+MANIFEST_PATH = os.path.join(CACHE_DIR, "build-manifest.json")
+PARSE_CACHE_DIR = os.path.join(CACHE_DIR, "parse")
+HIGHLIGHT_CACHE_DIR = os.path.join(CACHE_DIR, "highlight")
+DEPS_PATH = os.path.join(CACHE_DIR, "deps.json")
+ASSET_HASHES_PATH = os.path.join(CACHE_DIR, "asset-hashes.json")
+SEARCH_PATH = os.path.join(CACHE_DIR, "search.json")
+OUTPUTS_PATH = os.path.join(CACHE_DIR, "outputs.json")
+CHANGED_PATH = os.path.join(CACHE_DIR, "changed.json")
+# Sources at least this large are rendered block by block while being read
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+def make_resolver(basepath, assets=None):
+    # assets maps static files' site paths to their fingerprinted ones
+    resolve_url = BasepathResolver(basepath)
+    return resolve_url if assets is None else AssetResolver(assets, resolve_url)
+
+def generate_page(from_path, template_path, dest_path, basepath, verbose=True, template=None, profile=NULL_PROFILE, parse_cache=None, source_hash=None,
+                  stream_threshold=STREAM_THRESHOLD, writer=None, graph=None, assets=None, search=None, output_state=None,
+                  highlight_cache=None):
+    # With a writer, the page is handed to it and the write's Future is
+    # returned; otherwise it is written before returning. output_state lets
+    # unchanged output be recognized without reading it back.
+    if verbose: print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    started = time.perf_counter()
+    resolve_url = make_resolver(basepath, assets)
+    if template is None:
+        template = Template.load(template_path, resolve_url)
+    if os.path.getsize(from_path) >= stream_threshold:
+        title, document = generate_page_streaming(from_path, dest_path, template, resolve_url, output_state, highlight_cache)
+        record_document(from_path, dest_path, template_path, title, document, graph, search, source_hash)
+        if profile.enabled:
+            profile.record_page(from_path, time.perf_counter() - started, os.path.getsize(from_path), os.path.getsize(dest_path))
+        return
+    with profile.phase("read"):
+        with open(from_path, "r") as markdown_file:
+            markdown = markdown_file.read()
+    if source_hash is None and (parse_cache is not None or search is not None):
+        source_hash = hash_bytes(markdown.encode())
+    document = parse_page(markdown, from_path, profile, parse_cache, source_hash, highlight_cache)
+    record_document(from_path, dest_path, template_path, document.title, document, graph, search, source_hash)
+    # The HTML is streamed into a temporary file as it is rendered rather
+    # than joined in memory, so "render" includes writing it; "write" is
+    # the comparison with the existing output and the rename
+    chunks = render_chunks(template, document, resolve_url)
+    written = None
+    if writer is not None:
+        with profile.phase("render"):
+            temp_path, digest, size = writer.stage(dest_path, chunks)
+        # The writer times the commit itself, in its own thread
+        written = writer.commit(dest_path, temp_path, digest)
+    else:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with profile.phase("render"):
+            temp_path, digest, size = write_temp(dest_path, chunks)
+        with profile.phase("write"):
+            commit_temp(dest_path, temp_path, digest, output_state)
+    if profile.enabled:
+        profile.record_page(from_path, time.perf_counter() - started, len(markdown.encode()), size)
+    return written
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+def generate_page_streaming(from_path, dest_path, template, resolve_url, output_state=None, highlight_cache=None):
+    # Peak memory is bounded by the largest block rather than the file size;
+    # the parse cache is bypassed since there is no whole tree to store
+    document = Document()
     with open(from_path, "r") as markdown_file:
-        markdown = markdown_file.read()
+        title, content = stream_document(iter_markdown_blocks(markdown_file), resolve_url, document, highlight_cache)
+        if title is None:
+            raise Exception(f"A title cannot be found in {from_path}")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        write_chunks(dest_path, template.iter_render(Title=title, Content=content), state=output_state)
+    return title, document
+
+def record_document(from_path, dest_path, template_path, title, document, graph=None, search=None, source_hash=None):
+    if graph is not None:
+        urls = [url for _, url in document.links] + [url for _, url in document.images]
+        graph.record_page(from_path, dest_path, template_path, urls)
+    if search is not None:
+        search.record_page(from_path, dest_path, title, document.text, source_hash)
+
+def iter_pages(dir_path_content, dest_dir_path, exclude=None):
+    # Lazily yield (source, destination) for every markdown page
+    for relative_path, entry in walk_files(dir_path_content, include=("*.md",), exclude=exclude):
+        yield entry.path, os.path.join(dest_dir_path, *relative_path.split("/")).removesuffix(".md") + ".html"
+
+# The arguments that are the same for every page of a build, set once in
+# each pool process by _init_page_worker rather than pickled with every task
+_page_worker_build = None
+
+def _init_page_worker(build):
+    global _page_worker_build
+    _page_worker_build = build
+
+def _generate_page_worker(from_path, dest_path, source_hash):
+    # Runs in a pool process: capture anything printed so that the parent can
+    # replay it in page order instead of interleaving workers' output.
+    # Profile, cache counters, dependencies and search entries are sent back
+    # to be merged.
+    build = _page_worker_build
+    parse_cache, highlight_cache = build["parse_cache"], build["highlight_cache"]
+    graph = None if build["graph"] is None else build["graph"].fork()
+    search = None if build["search"] is None else build["search"].fork()
+    log = io.StringIO()
+    profile = BuildProfile() if build["profiling"] else NULL_PROFILE
+    if parse_cache is not None:
+        parse_cache.hits = parse_cache.misses = 0
+    if highlight_cache is not None:
+        highlight_cache.hits = highlight_cache.misses = 0
+    with contextlib.redirect_stdout(log):
+        try:
+            generate_page(from_path, build["template_path"], dest_path, build["basepath"], verbose=False, template=build["template"],
+                          profile=profile, parse_cache=parse_cache, source_hash=source_hash, graph=graph, assets=build["assets"],
+                          search=search, output_state=build["output_state"], highlight_cache=highlight_cache)
+        except Exception as e:
+            return log.getvalue(), e, None, None, None, None, None
+    cache_counts = None if parse_cache is None else (parse_cache.hits, parse_cache.misses)
+    highlight_counts = None if highlight_cache is None else (highlight_cache.hits, highlight_cache.misses)
+    return (log.getvalue(), None, profile.to_dict() if build["profiling"] else None, cache_counts, None if graph is None else graph.pages,
+            None if search is None else search.pages, highlight_counts)
+
+def generate_pages_parallel(pages, template_path, basepath, jobs, on_success=None, template=None, profile=NULL_PROFILE, parse_cache=None, source_hashes=None,
+                            graph=None, assets=None, search=None, highlight_cache=None, output_state=None):
+    # pages may be a generator: pages are submitted while it is still walking.
+    # Workers compare output with a snapshot of output_state; what they
+    # write is picked up by its refresh() after the build.
+    errors = []
+    source_hashes = source_hashes if source_hashes is not None else {}
+    build = {
+        "template_path": template_path,
+        "basepath": basepath,
+        "template": template,
+        "profiling": profile.enabled,
+        "parse_cache": parse_cache,
+        "highlight_cache": highlight_cache,
+        "graph": None if graph is None else graph.fork(),
+        "assets": assets,
+        "search": None if search is None else search.fork(),
+        "output_state": None if output_state is None else OutputState(None, output_state.files),
+    }
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_page_worker, initargs=(build,)) as executor:
+        futures = [
+            (from_path, dest_path, executor.submit(_generate_page_worker, from_path, dest_path, source_hashes.get(from_path)))
+            for from_path, dest_path in pages
+        ]
+        for from_path, dest_path, future in futures:
+            print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+            log, error, profile_data, cache_counts, dependencies, search_pages, highlight_counts = future.result()
+            print(log, end="")
+            if error is not None:
+                print(f"Failed to generate page from {from_path}: {error!r}")
+                errors.append(error)
+                continue
+            if profile_data is not None:
+                profile.merge(profile_data)
+            if cache_counts is not None:
+                parse_cache.hits += cache_counts[0]
+                parse_cache.misses += cache_counts[1]
+            if highlight_counts is not None:
+                highlight_cache.hits += highlight_counts[0]
+                highlight_cache.misses += highlight_counts[1]
+            if dependencies is not None:
+                graph.merge(dependencies)
+            if search_pages is not None:
+                search.merge(search_pages)
+            if on_success is not None:
+                on_success(from_path, dest_path)
+    if errors:
+        raise errors[0]
+
+def template_asset_names(template_path, assets):
     with open(template_path, "r") as template_file:
-        template = template_file.read()
-    html_string = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
-    html = template.replace("{{ Title }}", title).replace("{{ Content }}", html_string)
-    html = html.replace("href=\"/", f"href=\"{basepath}")
-    html = html.replace("src=\"/", f"src=\"{basepath}")
-    
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as dest_file:
-        dest_file.write(html)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for item in os.listdir(dir_path_content):
-        item_path = os.path.join(dir_path_content, item)
-        if os.path.isfile(item_path) and item_path.endswith(".md"):
-                generate_page(item_path, template_path, os.path.join(dest_dir_path, item).removesuffix(".md") + ".html", basepath)
+        urls = [url for _, url in URL_ATTRIBUTE_PATTERN.findall(template_file.read())]
+    return {url: assets[url] for url in urls if url in assets}
+
+def page_asset_names(graph, source_path, assets):
+    # Uses the site paths recorded when the page was last built, including
+    # those that weren't static files then (None), so that adding one
+    # changes the inputs too. A page without an entry has not been built
+    # yet, so it is rebuilt regardless.
+    if graph is None or source_path not in graph.pages:
+        return {}
+    return {site_path: assets.get(site_path) for site_path in graph.pages[source_path]["references"]}
+
+def generate_pages_recursive(config, manifest=None, jobs=1, hasher=hash_file, profile=NULL_PROFILE, parse_cache=None, graph=None, only=None,
+                             assets=None, search=None, output_state=None, highlight_cache=None):
+    # Generate the pages of config (a builder.SiteConfig). With only, just
+    # those sources are considered; the rest are kept as is.
+    template_path, basepath = config.template, config.basepath
+    if only is not None:
+        only = {os.path.normpath(path) for path in only}
+    template = Template.load(template_path, make_resolver(basepath, assets))
+    page_inputs = {}
+    source_hashes = {}
+    if manifest is not None:
+        template_hash = hasher(template_path)
+        if assets is not None:
+            template_assets = template_asset_names(template_path, assets)
+
+    def pages_to_generate():
+        # Checked as the walk goes, so generation starts on the first page
+        for from_path, dest_path in profile.iterate("walk", iter_pages(config.content, config.output, config.exclude)):
+            if only is not None and os.path.normpath(from_path) not in only:
+                if manifest is not None:
+                    manifest.keep(from_path)
+                continue
+            if manifest is not None:
+                source_hashes[from_path] = hasher(from_path)
+                page_inputs[from_path] = {"source": source_hashes[from_path], "template": template_hash, "basepath": basepath, "parser": PARSER_VERSION,
+                                         "highlight": HIGHLIGHT_VERSION}
+                if assets is not None:
+                    # Fingerprinted names are part of the output: a page is stale
+                    # when any asset it or the template refers to was renamed
+                    page_inputs[from_path]["assets"] = dict(template_assets, **page_asset_names(graph, from_path, assets))
+                # Pages missing from the search index, or indexed from an older
+                # version of their source, are regenerated to index them
+                if manifest.is_current(from_path, dest_path, page_inputs[from_path]) and (search is None or search.is_current(from_path, source_hashes[from_path])):
+                    continue
+            yield from_path, dest_path
+
+    pages = pages_to_generate()
+
+    def on_success(from_path, dest_path):
+        if manifest is not None:
+            if assets is not None:
+                # What the page refers to is only known once it has been
+                # built, e.g. for a new page or a new reference
+                page_inputs[from_path]["assets"] = dict(template_assets, **page_asset_names(graph, from_path, assets))
+            manifest.record(from_path, dest_path, page_inputs[from_path])
+
+    if jobs > 1:
+        generate_pages_parallel(pages, template_path, basepath, jobs, on_success, template=template, profile=profile, parse_cache=parse_cache,
+                                source_hashes=source_hashes, graph=graph, assets=assets, search=search, highlight_cache=highlight_cache,
+                                output_state=output_state)
+        return
+    # Render here while the writer's threads write finished pages. A page
+    # only counts as built once its write has succeeded.
+    writes = []
+    writer = OutputWriter(state=output_state, profile=profile)
+    try:
+        for from_path, dest_path in pages:
+            written = generate_page(from_path, template_path, dest_path, basepath, template=template, profile=profile,
+                                    parse_cache=parse_cache, source_hash=source_hashes.get(from_path), writer=writer, graph=graph,
+                                    assets=assets, search=search, output_state=output_state, highlight_cache=highlight_cache)
+            writes.append((from_path, dest_path, written))
+    finally:
+        writer.close()
+        for from_path, dest_path, written in writes:
+            if written is None or written.exception() is None:
+                on_success(from_path, dest_path)
+    for from_path, dest_path, written in writes:
+        if written is not None and written.exception() is not None:
+            print(f"Failed to write {dest_path}: {written.exception()!r}")
+            raise written.exception()
+
+def build(config=None, jobs=1, clean=False, use_hash=False, hasher=hash_file, pages=True, profile=NULL_PROFILE, parse_cache=None, only=None,
+          gzip_min_size=None, fingerprint=False, search=False, changed_path=CHANGED_PATH, highlight_cache=None):
+    # config is a builder.SiteConfig, or a dict of its arguments, giving the
+    # site's layout, basepath and excluded content, as for build_site
+    config = site_config(config)
+    docs_dir = os.path.join(os.path.curdir, config.output)
+    output_state = OutputState.load(OUTPUTS_PATH)
+    try:
+        build_outputs(config, output_state, jobs=jobs, clean=clean, use_hash=use_hash, hasher=hasher, pages=pages, profile=profile,
+                      parse_cache=parse_cache, only=only, gzip_min_size=gzip_min_size, fingerprint=fingerprint, search=search,
+                      highlight_cache=highlight_cache)
+    finally:
+        # Whatever the build got to, report it so that it gets deployed
+        changes = output_state.refresh(docs_dir)
+        output_state.save()
+        write_json(changed_path, changes)
+        print(f"Outputs: {len(changes['added'])} added, {len(changes['modified'])} modified, {len(changes['removed'])} removed")
+
+def build_outputs(config, output_state, jobs=1, clean=False, use_hash=False, hasher=hash_file, pages=True, profile=NULL_PROFILE, parse_cache=None,
+                  only=None, gzip_min_size=None, fingerprint=False, search=False, highlight_cache=None):
+    static_dir = os.path.join(os.path.curdir, config.static)
+    docs_dir = os.path.join(os.path.curdir, config.output)
+    layout = {"content_dir": config.content, "static_dir": config.static, "dest_dir": config.output}
+    resolve_url = BasepathResolver(config.basepath)
+    with profile.phase("static_copy"):
+        assets = None
+        rename = None
+        if fingerprint:
+            # Hashes are kept between builds and keyed by mtime and size
+            asset_hasher = HashCache.load(ASSET_HASHES_PATH)
+            assets = fingerprint_assets(static_dir, asset_hasher)
+            asset_hasher.save()
+            rename = lambda relative_path: assets["/" + relative_path.replace(os.sep, "/")][1:].replace("/", os.sep)
+        if clean:
+            # sync_static below does the only copy, with the original
+            # names or the fingerprinted ones
+            if os.path.exists(docs_dir):
+                shutil.rmtree(docs_dir)
+            manifest = BuildManifest(MANIFEST_PATH)
+            graph = DependencyGraph(DEPS_PATH, **layout)
+            search_index = SearchIndex(SEARCH_PATH, config.output, resolve_url=resolve_url) if search else None
         else:
-            generate_pages_recursive(item_path, template_path, os.path.join(dest_dir_path, item), basepath)
-
-def main():
-    # print(TextNode("This is a text node", TextType.BOLD, "https://www.boot.dev"))
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    copy_source_destination(
-        os.path.join(os.path.curdir, "static"), 
-        os.path.join(os.path.curdir, "docs"),
-        verbose=True
-    )
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+            manifest = BuildManifest.load(MANIFEST_PATH)
+            graph = DependencyGraph.load(DEPS_PATH, **layout)
+            search_index = SearchIndex.load(SEARCH_PATH, config.output, resolve_url) if search else None
+        sync_static(static_dir, docs_dir, manifest, use_hash=use_hash, verbose=True, rename=rename)
+        asset_manifest_path = os.path.join(docs_dir, ASSET_MANIFEST_NAME)
+        if fingerprint:
+            write_asset_manifest(docs_dir, assets)
+        elif os.path.exists(asset_manifest_path) and asset_manifest_path not in manifest.static:
+            os.remove(asset_manifest_path)
+    if not pages:
+        manifest.save()
+        update_sidecars(docs_dir, gzip_min_size, profile)
+        return
+    try:
+        generate_pages_recursive(config, manifest, jobs=jobs, hasher=hasher, profile=profile, parse_cache=parse_cache, graph=graph, only=only,
+                                 assets=assets, search=search_index, output_state=output_state, highlight_cache=highlight_cache)
+    finally:
+        # Keep the pages that did succeed even when another one failed
+        manifest.save()
+        graph.save()
+        if search_index is not None:
+            search_index.save()
+    manifest.remove_stale_pages(verbose=True)
+    manifest.save()
+    # Sources the walk didn't reach this build are gone from the site
+    graph.prune(manifest.seen)
+    graph.save()
+    if search_index is not None:
+        search_index.prune(manifest.seen)
+        search_index.write(verbose=True)
+        search_index.save()
+    update_sidecars(docs_dir, gzip_min_size, profile)
+    if parse_cache is not None:
+        parse_cache.trim()
+        print(parse_cache.stats())
+    if highlight_cache is not None:
+        highlight_cache.trim()
+        print(highlight_cache.stats())
+
+def update_sidecars(docs_dir, gzip_min_size, profile=NULL_PROFILE):
+    # Builds without --gzip still drop the sidecars this build made stale
+    with profile.phase("compress"):
+        if gzip_min_size is None:
+            remove_stale_sidecars(docs_dir, verbose=True)
+        else:
+            compress_outputs(docs_dir, gzip_min_size, verbose=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes used to generate pages")
+    parser.add_argument("--clean", action="store_true", help="wipe docs/ and rebuild everything from scratch")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="skip content matching GLOB, by path relative to content/ or by name (repeatable)")
+    parser.add_argument("--hash", action="store_true", help="compare static files by content hash instead of mtime")
+    parser.add_argument("--no-parse-cache", action="store_true", help="always parse markdown instead of reusing cached trees")
+    parser.add_argument("--parse-cache-size", type=int, default=64, metavar="MB", help="size limit of the parse cache (default 64)")
+    parser.add_argument("--no-highlight-cache", action="store_true", help="always highlight code blocks instead of reusing cached results")
+    parser.add_argument("--fingerprint", action="store_true", help="publish static files under content-hashed names and rewrite references")
+    parser.add_argument("--search", action="store_true", help="write a sharded full-text search index to docs/search/")
+    parser.add_argument("--gzip", action="store_true", help="write .gz sidecars next to HTML, CSS and SVG outputs")
+    parser.add_argument("--gzip-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES", help="smallest file to compress (default 1024)")
+    parser.add_argument("--changed-json", default=CHANGED_PATH, metavar="PATH",
+                        help=f"where to write the added, modified and removed output paths (default {CHANGED_PATH})")
+    parser.add_argument("--profile", action="store_true", help="print per-phase timings and the slowest pages")
+    parser.add_argument("--profile-json", metavar="PATH", help="write the profile as JSON to PATH (implies --profile)")
+    return parser.parse_args(argv)
+
+def parse_serve_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve docs/ locally.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("-p", "--port", type=int, default=8888, help="port to serve on")
+    parser.add_argument("--watch", action="store_true", help="rebuild on changes and reload open browsers")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls for changes")
+    return parser.parse_args(argv)
+
+def parse_deps_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py deps", description="Show the dependency graph recorded by the last build, as JSON.")
+    parser.add_argument("paths", nargs="*", help="only show these sources' dependencies and dependents")
+    parser.add_argument("--affected", action="store_true", help="print the pages to rebuild when paths change, one per line")
+    return parser.parse_args(argv)
+
+def deps_main(argv=None):
+    args = parse_deps_args(argv)
+    graph = DependencyGraph.load(DEPS_PATH)
+    if not graph.pages:
+        print(f"No dependency graph in {DEPS_PATH}, run a build first", file=sys.stderr)
+        return 1
+    if args.affected:
+        for source_path in graph.affected(args.paths):
+            print(source_path)
+        return 0
+    if not args.paths:
+        print(json.dumps(graph.pages, indent=2, sort_keys=True))
+        return 0
+    print(json.dumps({
+        path: {"dependencies": graph.dependencies(path), "dependents": graph.dependents(path)}
+        for path in args.paths
+    }, indent=2))
+    return 0
+
+def parse_render_server_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py render-server", description="Serve markdown previews over HTTP with a warm parser and an LRU cache.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("-p", "--port", type=int, default=8889, help="port to serve on")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--template", default="template.html", help="template for ?template=page renders")
+    parser.add_argument("--cache-size", type=int, default=256, metavar="ENTRIES", help="number of rendered results to keep (default 256)")
+    parser.add_argument("--no-highlight-cache", action="store_true", help="always highlight code blocks instead of reusing cached results")
+    return parser.parse_args(argv)
+
+def render_server_main(argv=None):
+    args = parse_render_server_args(argv)
+    template_text = None
+    if os.path.exists(args.template):
+        with open(args.template, "r") as template_file:
+            template_text = template_file.read()
+    highlight_cache = None if args.no_highlight_cache else HighlightCache(HIGHLIGHT_CACHE_DIR)
+    service = RenderService(template_text, args.basepath, args.cache_size, highlight_cache)
+    serve_render(service, args.port, args.host)
+
+def serve_main(argv=None):
+    args = parse_serve_args(argv)
+    config = SiteConfig(basepath=args.basepath)
+    # Hashes of unchanged sources stay warm across rebuilds
+    hasher = HashCache()
+    parse_cache = ParseCache(PARSE_CACHE_DIR)
+    highlight_cache = HighlightCache(HIGHLIGHT_CACHE_DIR)
+    build(config, hasher=hasher, parse_cache=parse_cache, highlight_cache=highlight_cache)
+
+    def rebuild(changed):
+        # Rebuild only the pages whose source, template or linked static
+        # files changed, plus new or deleted sources
+        graph = DependencyGraph.load(DEPS_PATH)
+        if not graph.pages:
+            build(config, hasher=hasher, parse_cache=parse_cache, highlight_cache=highlight_cache)
+            return
+        only = set(graph.affected(changed))
+        content_dir = os.path.normpath(config.content) + os.sep
+        only.update(path for path in changed if path.endswith(".md") and os.path.normpath(path).startswith(content_dir))
+        build(config, hasher=hasher, pages=bool(only), parse_cache=parse_cache, only=only, highlight_cache=highlight_cache)
+
+    serve(rebuild, config.output, [config.content, config.static, config.template], args.port, args.watch, args.interval)
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "serve":
+        serve_main(argv[1:])
+        return
+    if argv and argv[0] == "deps":
+        sys.exit(deps_main(argv[1:]))
+    if argv and argv[0] == "render-server":
+        render_server_main(argv[1:])
+        return
+    args = parse_args(argv)
+    profile = BuildProfile() if args.profile or args.profile_json else NULL_PROFILE
+    parse_cache = None if args.no_parse_cache else ParseCache(PARSE_CACHE_DIR, args.parse_cache_size * 1024 * 1024)
+    highlight_cache = None if args.no_highlight_cache else HighlightCache(HIGHLIGHT_CACHE_DIR)
+    build(SiteConfig(basepath=args.basepath, exclude=args.exclude), args.jobs, args.clean, args.hash, profile=profile,
+          parse_cache=parse_cache, gzip_min_size=args.gzip_min_size if args.gzip else None, fingerprint=args.fingerprint,
+          search=args.search, changed_path=args.changed_json, highlight_cache=highlight_cache)
+    if profile.enabled:
+        profile.finish()
+        print(profile.format_table())
+        if args.profile_json:
+            profile.write_json(args.profile_json)
     
 if __name__ == '__main__':
     main()
@@ -0,0 +1,109 @@
+import hashlib, json, os
+
+MANIFEST_VERSION = 1
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+def write_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as json_file:
+        json.dump(data, json_file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+class HashCache:
+    # Memoizes file hashes by (mtime, size) so that a long-running process
+    # only re-reads files that were touched since they were last hashed.
+    # With a path, the entries can be saved and loaded between builds.
+
+    def __init__(self, path=None, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, {file_path: (tuple(key), digest) for file_path, (key, digest) in data.get("entries", {}).items()})
+
+    def __call__(self, path):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        digest = hash_file(path)
+        self.entries[path] = (key, digest)
+        return digest
+
+    def save(self):
+        if self.path is None:
+            return
+        # Drop entries of files that have been deleted
+        entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        write_json(self.path, {"version": MANIFEST_VERSION, "entries": entries})
+
+class BuildManifest:
+    # Records, per source page, the hashes of everything its output depends on
+    # so that unchanged pages can be skipped on the next build.
+
+    def __init__(self, path=None, pages=None, static=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        # Output paths of the static files copied by the last sync
+        self.static = set(static) if static is not None else set()
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("static", []))
+
+    def is_current(self, source_path, dest_path, inputs):
+        self.seen.add(source_path)
+        entry = self.pages.get(source_path)
+        if entry is None:
+            return False
+        return entry["dest"] == dest_path and entry["inputs"] == inputs and os.path.exists(dest_path)
+
+    def keep(self, source_path):
+        # Leave a page's entry and output as they are without checking them
+        self.seen.add(source_path)
+
+    def record(self, source_path, dest_path, inputs):
+        self.seen.add(source_path)
+        self.pages[source_path] = {"dest": dest_path, "inputs": inputs}
+
+    def remove_stale_pages(self, verbose=False):
+        # Outputs of sources that were not visited this build have been deleted
+        removed = []
+        for source_path in sorted(set(self.pages) - self.seen):
+            dest_path = self.pages.pop(source_path)["dest"]
+            if os.path.exists(dest_path):
+                if verbose: print(f"Removing {dest_path} (source {source_path} was deleted or excluded)")
+                os.remove(dest_path)
+            removed.append(dest_path)
+        return removed
+
+    def save(self):
+        if self.path is None:
+            return
+        write_json(self.path, {"version": MANIFEST_VERSION, "pages": self.pages, "static": sorted(self.static)})
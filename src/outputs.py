@@ -0,0 +1,92 @@
+import json, os
+
+from manifest import MANIFEST_VERSION, hash_file, write_json
+
+def relative_output_path(path, directory):
+    return os.path.relpath(path, directory).replace(os.sep, "/")
+
+class OutputState:
+    # Remembers (mtime, size, hash) of every file in the output directory as
+    # of the last build. A file whose mtime and size still match is known to
+    # hold the stored hash, so new output can be compared against it
+    # without reading the file, and refresh() only has to hash the files
+    # that were actually rewritten.
+
+    def __init__(self, path=None, files=None):
+        self.path = path
+        # normalized path -> [mtime_ns, size, sha256]
+        self.files = files if files is not None else {}
+        # Entries as of the last refresh of the files recorded since
+        self.recorded = {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as state_file:
+                data = json.load(state_file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("files", {}))
+
+    def is_identical(self, path, digest):
+        # True or False when the stored state decides it, None when there is
+        # nothing stored for path
+        entry = self.files.get(os.path.normpath(path))
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return [stat.st_mtime_ns, stat.st_size] == entry[:2] and entry[2] == digest
+
+    def record(self, path, digest):
+        stat = os.stat(path)
+        path = os.path.normpath(path)
+        self.recorded.setdefault(path, self.files.get(path))
+        self.files[path] = [stat.st_mtime_ns, stat.st_size, digest]
+
+    def refresh(self, directory):
+        # Bring the state up to date with directory and return its changes
+        # since the last refresh as {"added", "modified", "removed"} lists of
+        # paths relative to directory. A rewritten file with the same
+        # content (e.g. after --clean) doesn't count as modified.
+        changes = {"added": [], "modified": [], "removed": []}
+        seen = set()
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.normpath(os.path.join(root, name))
+                seen.add(path)
+                stat = os.stat(path)
+                entry = self.files.get(path)
+                if entry is not None and [stat.st_mtime_ns, stat.st_size] == entry[:2]:
+                    if path not in self.recorded:
+                        continue
+                    digest = entry[2]
+                else:
+                    digest = hash_file(path)
+                # Compare with the state before this build's record() calls
+                previous = self.recorded.get(path, entry)
+                if previous is None:
+                    changes["added"].append(relative_output_path(path, directory))
+                elif previous[2] != digest:
+                    changes["modified"].append(relative_output_path(path, directory))
+                self.files[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        prefix = os.path.normpath(directory) + os.sep
+        for path in sorted(set(self.files) - seen):
+            if path.startswith(prefix):
+                # Files recorded this build and gone again never existed
+                if self.recorded.get(path, self.files[path]) is not None:
+                    changes["removed"].append(relative_output_path(path, directory))
+                del self.files[path]
+        self.recorded = {}
+        for paths in changes.values():
+            paths.sort()
+        return changes
+
+    def save(self):
+        if self.path is None:
+            return
+        write_json(self.path, {"version": MANIFEST_VERSION, "files": self.files})
@@ -0,0 +1,104 @@
+import contextlib, json, time
+
+# URLs are resolved while rendering, so that time is part of "render"
+PHASES = ("walk", "read", "block_split", "inline_parse", "render", "write", "static_copy", "compress")
+
+class BuildProfile:
+    # Accumulates wall time and call counts per build phase plus per-page
+    # timings and sizes. Profiles from worker processes are combined with
+    # merge(to_dict()).
+    enabled = True
+
+    def __init__(self):
+        self.phases = {name: {"seconds": 0.0, "count": 0} for name in PHASES}
+        self.pages = []
+        self.started = time.perf_counter()
+        self.wall_time = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def iterate(self, name, iterable):
+        # Time only the work of producing each item, e.g. a lazy walk
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - started)
+                return
+            self.add(name, time.perf_counter() - started, count=0)
+            yield item
+
+    def add(self, name, seconds, count=1):
+        phase = self.phases.setdefault(name, {"seconds": 0.0, "count": 0})
+        phase["seconds"] += seconds
+        phase["count"] += count
+
+    def record_page(self, path, seconds, bytes_in, bytes_out):
+        self.pages.append({"path": path, "seconds": seconds, "bytes_in": bytes_in, "bytes_out": bytes_out})
+
+    def merge(self, data):
+        for name, phase in data["phases"].items():
+            self.add(name, phase["seconds"], phase["count"])
+        self.pages.extend(data["pages"])
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self.started
+
+    def to_dict(self):
+        return {
+            "wall_time": self.wall_time,
+            "phases": self.phases,
+            "pages": sorted(self.pages, key=lambda page: page["seconds"], reverse=True),
+            "page_count": len(self.pages),
+            "bytes_in": sum(page["bytes_in"] for page in self.pages),
+            "bytes_out": sum(page["bytes_out"] for page in self.pages),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
+
+    def format_table(self, slowest=10):
+        data = self.to_dict()
+        # With --jobs, phase times are summed over workers and can exceed the wall time
+        total = sum(phase["seconds"] for phase in data["phases"].values()) or 1.0
+        lines = [f"{'phase':<16}{'total (ms)':>12}{'count':>8}{'share':>8}"]
+        for name, phase in data["phases"].items():
+            lines.append(f"{name:<16}{phase['seconds'] * 1000:>12.2f}{phase['count']:>8}{phase['seconds'] / total:>8.1%}")
+        lines.append("")
+        lines.append(f"{'slowest pages':<48}{'ms':>10}{'bytes in':>10}{'bytes out':>11}")
+        for page in data["pages"][:slowest]:
+            lines.append(f"{page['path']:<48}{page['seconds'] * 1000:>10.2f}{page['bytes_in']:>10}{page['bytes_out']:>11}")
+        lines.append("")
+        wall_time = "-" if data["wall_time"] is None else f"{data['wall_time'] * 1000:.2f} ms"
+        lines.append(f"{data['page_count']} pages, {data['bytes_in']} bytes in, {data['bytes_out']} bytes out, wall time {wall_time}")
+        return "\n".join(lines)
+
+class NullProfile:
+    # Stand-in used when profiling is off; every method is a no-op
+    enabled = False
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def iterate(self, name, iterable):
+        return iterable
+
+    def add(self, name, seconds, count=1):
+        pass
+
+    def record_page(self, path, seconds, bytes_in, bytes_out):
+        pass
+
+    def merge(self, data):
+        pass
+
+NULL_PROFILE = NullProfile()
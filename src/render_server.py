@@ -0,0 +1,215 @@
+import hashlib, json, statistics, threading, time
+from collections import OrderedDict, deque
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from document import parse_document
+from template import Template
+from urls import BasepathResolver
+
+RENDER_PATH = "/render"
+STATS_PATH = "/stats"
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Latency percentiles are computed over this many recent renders
+LATENCY_SAMPLES = 1000
+
+class RenderCache:
+    # Bounded LRU cache of rendered HTML, shared by the server's threads.
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        with self.lock:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+class LatencyStats:
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.recent = deque(maxlen=samples)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def stats(self):
+        with self.lock:
+            recent = sorted(self.recent)
+            count, total = self.count, self.total
+        if not recent:
+            return {"count": 0}
+        percentile = lambda fraction: recent[min(len(recent) - 1, int(fraction * len(recent)))] * 1000
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000,
+            "median_ms": statistics.median(recent) * 1000,
+            "p95_ms": percentile(0.95),
+            "max_ms": recent[-1] * 1000,
+        }
+
+class RenderService:
+    # Renders markdown with a warm parser. "fragment" is the page content
+    # alone (markdown_to_html_node(...).to_html()); "page" also fills in the
+    # site template. Results are cached by the hash of the markdown and of
+    # the template used, so a changed template never serves stale pages.
+    # highlight_cache (a cache.HighlightCache) keeps highlighted code blocks
+    # across restarts and across edits to the rest of a document.
+
+    def __init__(self, template_text=None, basepath="/", max_entries=256, highlight_cache=None):
+        self.resolve_url = BasepathResolver(basepath)
+        self.template = None if template_text is None else Template(template_text, self.resolve_url)
+        self.template_hash = None if template_text is None else hashlib.sha256(template_text.encode()).hexdigest()
+        self.cache = RenderCache(max_entries)
+        self.highlight_cache = highlight_cache
+        self.latency = LatencyStats()
+        self.started = time.time()
+
+    def render(self, markdown, template="fragment"):
+        # Returns (html, cached); raises ValueError for an unknown or
+        # unavailable template or a page without a title
+        started = time.perf_counter()
+        if template == "page":
+            if self.template is None:
+                raise ValueError("No page template configured")
+            template_key = self.template_hash
+        elif template == "fragment":
+            template_key = "fragment"
+        else:
+            raise ValueError(f"Unknown template: {template}")
+        key = (hashlib.sha256(markdown.encode()).hexdigest(), template_key)
+        html = self.cache.get(key)
+        cached = html is not None
+        if not cached:
+            document = parse_document(markdown, self.highlight_cache)
+            if template == "page":
+                if document.title is None:
+                    raise ValueError("A title cannot be found")
+                html = self.template.render(Title=document.title, Content=document.root.iter_html(self.resolve_url))
+            else:
+                html = document.root.to_html(self.resolve_url)
+            self.cache.put(key, html)
+        self.latency.add(time.perf_counter() - started)
+        return html, cached
+
+    def stats(self):
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "cache": self.cache.stats(),
+            "latency": self.latency.stats(),
+        }
+
+class RenderHandler(BaseHTTPRequestHandler):
+    # POST /render?template=fragment|page with the markdown as the body;
+    # GET /stats for cache and latency stats as JSON.
+
+    def __init__(self, *args, service=None, **kwargs):
+        self.service = service
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != STATS_PATH:
+            self.send_text(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        self.send_body(HTTPStatus.OK, "application/json", json.dumps(self.service.stats(), indent=2).encode())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != RENDER_PATH:
+            self.send_text(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        length = self.content_length()
+        if length is None:
+            # Without a usable length the body can't be read, nor skipped to
+            # reuse the connection
+            self.close_connection = True
+            self.send_text(HTTPStatus.BAD_REQUEST, "Missing or invalid Content-Length")
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_text(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Markdown too large")
+            return
+        markdown = self.rfile.read(length).decode("utf-8", errors="replace")
+        template = parse_qs(url.query).get("template", ["fragment"])[0]
+        try:
+            html, cached = self.service.render(markdown, template)
+        except ValueError as e:
+            self.send_text(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+            return
+        self.send_body(HTTPStatus.OK, "text/html; charset=utf-8", html.encode(), {"X-Render-Cache": "hit" if cached else "miss"})
+
+    def content_length(self):
+        # The body's length, or None unless the header is a non-negative integer
+        try:
+            length = int(self.headers.get("Content-Length"))
+        except (TypeError, ValueError):
+            return None
+        return length if length >= 0 else None
+
+    def send_text(self, status, text):
+        self.send_body(status, "text/plain; charset=utf-8", text.encode())
+
+    def send_body(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request is too noisy at keystroke rates
+        pass
+
+def make_render_server(service, port=8889, host="127.0.0.1"):
+    handler = partial(RenderHandler, service=service)
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    return httpd
+
+def serve_render(service, port=8889, host="127.0.0.1"):
+    httpd = make_render_server(service, port, host)
+    print(f"Rendering markdown at http://{host}:{httpd.server_address[1]}{RENDER_PATH}, stats at {STATS_PATH}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
@@ -0,0 +1,148 @@
+import json, os, re
+
+from manifest import write_json
+from writer import write_file
+
+SEARCH_VERSION = 2
+WORD_PATTERN = re.compile(r"\w+")
+# Terms are sharded by this many leading characters, so a client fetches
+# only the shard for what has been typed so far
+PREFIX_LENGTH = 2
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+
+def page_postings(text):
+    # term -> word positions within the page, for a Document's text runs
+    postings = {}
+    position = 0
+    for run in text:
+        for term in tokenize(run):
+            postings.setdefault(term, []).append(position)
+            position += 1
+    return postings
+
+def shard_name(term):
+    prefix = term[:PREFIX_LENGTH]
+    if prefix.isascii():
+        return prefix
+    # Longer than any ASCII prefix, so the names can't collide
+    return "u" + prefix.encode().hex()
+
+def page_search_url(dest_path, dest_dir):
+    # "docs/blog/tom/index.html" -> "/blog/tom/"
+    url = "/" + os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    return url.removesuffix("index.html")
+
+class SearchIndex:
+    # Inverted index of the site's text, kept per page in the cache so that
+    # a build only re-indexes the pages it regenerated. write() publishes it
+    # under dest_dir/search/ as index.json (page ids, URLs, titles and shard
+    # names) plus one terms/<prefix>.json shard per term prefix, mapping each
+    # term to [[page id, [positions]], ...]. Only shards containing a term of
+    # a changed page are rewritten. Page URLs are stored site-relative and
+    # passed through resolve_url (e.g. urls.BasepathResolver) when written.
+
+    def __init__(self, path=None, dest_dir="docs", pages=None, next_id=0, resolve_url=None):
+        self.path = path
+        self.dest_dir = dest_dir
+        self.resolve_url = resolve_url
+        self.output_dir = os.path.join(dest_dir, "search")
+        # source path -> {"id", "url", "title", "source", "terms": {term: positions}},
+        # where source is the hash of the markdown that was indexed
+        self.pages = pages if pages is not None else {}
+        self.next_id = next_id
+        self.changed_shards = set()
+
+    @classmethod
+    def load(cls, path, dest_dir="docs", resolve_url=None):
+        try:
+            with open(path, "r") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return cls(path, dest_dir, resolve_url=resolve_url)
+        if not isinstance(data, dict) or data.get("version") != SEARCH_VERSION:
+            return cls(path, dest_dir, resolve_url=resolve_url)
+        return cls(path, dest_dir, data.get("pages", {}), data.get("next_id", 0), resolve_url)
+
+    def fork(self):
+        # Empty index for recording in a worker process; ids are assigned on merge
+        return SearchIndex(None, self.dest_dir)
+
+    def record_page(self, source_path, dest_path, title, text, source_hash=None):
+        url = page_search_url(dest_path, self.dest_dir)
+        self.set_page(source_path, {"url": url, "title": title, "source": source_hash, "terms": page_postings(text)})
+
+    def is_current(self, source_path, source_hash):
+        # False when the page was edited by a build that didn't index it
+        page = self.pages.get(source_path)
+        return page is not None and source_hash is not None and page.get("source") == source_hash
+
+    def set_page(self, source_path, page):
+        old = self.pages.get(source_path)
+        if old is None:
+            page_id = self.next_id
+            self.next_id += 1
+        else:
+            page_id = old["id"]
+            self.changed_shards.update(shard_name(term) for term in old["terms"])
+        self.pages[source_path] = dict(page, id=page_id)
+        self.changed_shards.update(shard_name(term) for term in page["terms"])
+
+    def merge(self, pages):
+        for source_path in sorted(pages):
+            page = dict(pages[source_path])
+            page.pop("id", None)
+            self.set_page(source_path, page)
+
+    def prune(self, sources):
+        # Drop pages whose source wasn't part of this build (deleted or
+        # excluded); sources are the ones the build walked
+        for source_path in [source_path for source_path in self.pages if source_path not in sources]:
+            self.changed_shards.update(shard_name(term) for term in self.pages.pop(source_path)["terms"])
+
+    def shards(self, names=None):
+        # shard name -> {term: [[page id, positions], ...]}, limited to names
+        shards = {}
+        for page in sorted(self.pages.values(), key=lambda page: page["id"]):
+            for term, positions in page["terms"].items():
+                name = shard_name(term)
+                if names is None or name in names:
+                    shards.setdefault(name, {}).setdefault(term, []).append([page["id"], positions])
+        return shards
+
+    def page_url(self, page):
+        return page["url"] if self.resolve_url is None else self.resolve_url(page["url"])
+
+    def write(self, verbose=False):
+        # Returns the paths of the files that were rewritten
+        terms_dir = os.path.join(self.output_dir, "terms")
+        os.makedirs(terms_dir, exist_ok=True)
+        existing = {name.removesuffix(".json") for name in os.listdir(terms_dir) if name.endswith(".json")}
+        all_shards = {shard_name(term) for page in self.pages.values() for term in page["terms"]}
+        # Shards missing on disk (e.g. after a clean build) are written too
+        names = (self.changed_shards | all_shards - existing) & all_shards
+        written = []
+        for name, terms in self.shards(names).items():
+            path = os.path.join(terms_dir, name + ".json")
+            if write_file(path, json.dumps(terms, separators=(",", ":"), sort_keys=True).encode()):
+                written.append(path)
+        for name in sorted(existing - all_shards):
+            os.remove(os.path.join(terms_dir, name + ".json"))
+        index = {
+            "version": SEARCH_VERSION,
+            "prefix_length": PREFIX_LENGTH,
+            "pages": {page["id"]: {"url": self.page_url(page), "title": page["title"]} for page in self.pages.values()},
+            "shards": sorted(all_shards),
+        }
+        index_path = os.path.join(self.output_dir, "index.json")
+        if write_file(index_path, json.dumps(index, separators=(",", ":"), sort_keys=True).encode()):
+            written.append(index_path)
+        self.changed_shards = set()
+        if verbose: print(f"Search index: {len(self.pages)} pages, {len(all_shards)} shards, {len(written)} files written")
+        return written
+
+    def save(self):
+        if self.path is None:
+            return
+        write_json(self.path, {"version": SEARCH_VERSION, "pages": self.pages, "next_id": self.next_id})
@@ -0,0 +1,118 @@
+import os, threading, time
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from watcher import PollingWatcher
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = f"""<script>
+new EventSource("{RELOAD_PATH}").onmessage = function () {{ location.reload(); }};
+</script>
+"""
+
+class ReloadNotifier:
+    # Counts finished builds; browsers waiting on RELOAD_PATH are woken up
+    # whenever the count changes.
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+
+    def __init__(self, *args, notifier=None, **kwargs):
+        self.notifier = notifier
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.send_reload_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self.send_html_with_reload_script(path)
+            return
+        super().do_GET()
+
+    def send_html_with_reload_script(self, path):
+        with open(path, "rb") as html_file:
+            html = html_file.read()
+        script = RELOAD_SCRIPT.encode()
+        index = html.rfind(b"</body>")
+        html = html + script if index == -1 else html[:index] + script + html[index:]
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(html)
+
+    def send_reload_events(self):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.notifier.generation
+        try:
+            while True:
+                new_generation = self.notifier.wait(generation, timeout=15)
+                if new_generation != generation:
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+                    return
+                # Keep-alive comment so proxies don't drop the connection
+                self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+def serve(build, directory, watch_paths=(), port=8888, watch=True, interval=0.5):
+    # Serve directory over HTTP. With watch, poll watch_paths and call
+    # build(changed_paths) in-process whenever something changes, then tell
+    # open browsers to reload.
+    notifier = ReloadNotifier()
+    handler = partial(LiveReloadHandler, directory=directory, notifier=notifier)
+    httpd = ThreadingHTTPServer(("", port), handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving {directory} at http://localhost:{httpd.server_address[1]}/")
+
+    try:
+        if not watch:
+            thread.join()
+            return
+        watcher = PollingWatcher(watch_paths)
+        print(f"Watching {', '.join(watch_paths)} for changes")
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            print(f"Changed: {', '.join(changed)}")
+            started = time.perf_counter()
+            try:
+                build(changed)
+            except Exception as e:
+                print(f"Build failed: {e!r}")
+                continue
+            print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+            notifier.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,71 @@
+import os, shutil
+
+from manifest import hash_file
+from walk import walk_files
+
+NS_PER_SECOND = 1_000_000_000
+
+def list_files(source, include=None, exclude=None):
+    return [entry.path for _, entry in walk_files(source, include, exclude)]
+
+def is_unchanged(source_path, dest_path, use_hash=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if use_hash:
+        return hash_file(source_path) == hash_file(dest_path)
+    # copy2 preserves the mtime, so any difference means the source changed,
+    # even a same-size edit within the same second. Only when the
+    # destination's filesystem truncated the copy's timestamp to whole
+    # seconds are whole seconds compared.
+    if source_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if dest_stat.st_mtime_ns % NS_PER_SECOND == 0:
+        return source_stat.st_mtime_ns // NS_PER_SECOND == dest_stat.st_mtime_ns // NS_PER_SECOND
+    return False
+
+def prune_empty_dirs(path, stop):
+    stop = os.path.abspath(stop)
+    path = os.path.abspath(path)
+    while path != stop and path.startswith(stop + os.sep):
+        try:
+            os.rmdir(path)
+        except OSError:
+            return
+        path = os.path.dirname(path)
+
+def sync_static(source, destination, manifest=None, use_hash=False, verbose=False, rename=None):
+    # Copy only new or changed files from source into destination and delete
+    # files that a previous sync copied but whose source is gone. Anything
+    # else in destination (e.g. generated pages) is left alone. rename maps
+    # a file's path relative to source to its path relative to destination.
+    if verbose: print(f"Syncing {source} to {destination}")
+    copied, unchanged, removed = [], [], []
+    synced = set()
+    for source_path in list_files(source):
+        relative_path = os.path.relpath(source_path, source)
+        dest_path = os.path.join(destination, relative_path if rename is None else rename(relative_path))
+        synced.add(dest_path)
+        if is_unchanged(source_path, dest_path, use_hash):
+            unchanged.append(dest_path)
+            continue
+        if verbose: print(f"Copying {source_path} to {dest_path}")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(source_path, dest_path)
+        copied.append(dest_path)
+
+    if manifest is not None:
+        for dest_path in sorted(manifest.static - synced):
+            if os.path.isfile(dest_path):
+                if verbose: print(f"Removing {dest_path}")
+                os.remove(dest_path)
+                prune_empty_dirs(os.path.dirname(dest_path), destination)
+            removed.append(dest_path)
+        manifest.static = synced
+
+    if verbose: print(f"Static files: {len(copied)} copied, {len(unchanged)} unchanged, {len(removed)} removed")
+    return copied, unchanged, removed
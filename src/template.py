@@ -0,0 +1,50 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# Attribute names are preceded by whitespace inside a tag
+URL_ATTRIBUTE_PATTERN = re.compile(r'(?<=\s)(href|src)="([^"]*)"')
+KNOWN_PLACEHOLDERS = ("Title", "Content")
+
+def resolve_attribute_urls(html: str, resolve_url):
+    if resolve_url is None:
+        return html
+    return URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match.group(1)}="{resolve_url(match.group(2))}"', html)
+
+class Template:
+    # A template pre-split at its {{ Name }} placeholders. parts alternates
+    # between literal text (even indexes) and placeholder names (odd indexes),
+    # so a page is assembled with a single join. URLs in the literal text's
+    # href/src attributes are resolved once, when the template is compiled.
+
+    def __init__(self, text: str, resolve_url=None, placeholders=KNOWN_PLACEHOLDERS):
+        parts = PLACEHOLDER_PATTERN.split(text)
+        names = parts[1::2]
+        unknown = sorted(set(names) - set(placeholders))
+        if unknown:
+            raise ValueError(f"Unknown template placeholder(s): {', '.join(unknown)}")
+        for i in range(0, len(parts), 2):
+            parts[i] = resolve_attribute_urls(parts[i], resolve_url)
+        self.parts = parts
+        self.placeholders = tuple(dict.fromkeys(names))
+
+    @classmethod
+    def load(cls, path, resolve_url=None, placeholders=KNOWN_PLACEHOLDERS):
+        with open(path, "r") as template_file:
+            return cls(template_file.read(), resolve_url, placeholders)
+
+    def render(self, **values):
+        return "".join(self.iter_render(**values))
+
+    def iter_render(self, **values):
+        # Values may be strings or iterables of string chunks (for example
+        # HTMLNode.iter_html()), which are streamed through without joining
+        missing = [name for name in self.placeholders if name not in values]
+        if missing:
+            raise ValueError(f"Missing value(s) for template placeholder(s): {', '.join(missing)}")
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                yield part
+            elif isinstance(values[part], str):
+                yield values[part]
+            else:
+                yield from values[part]
@@ -0,0 +1,43 @@
+import json, os, tempfile
+import unittest
+
+from assets import ASSET_MANIFEST_NAME, fingerprint_assets, fingerprinted_name, static_site_path, write_asset_manifest
+from manifest import HashCache, hash_bytes
+
+
+class TestFingerprintedName(unittest.TestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("/images/tom.png", "0123456789abcdef"), "/images/tom.0123456789.png")
+
+    def test_fingerprinted_name_no_extension(self):
+        self.assertEqual(fingerprinted_name("/LICENSE", "0123456789abcdef", length=4), "/LICENSE.0123")
+
+    def test_static_site_path(self):
+        self.assertEqual(static_site_path(os.path.join("static", "images", "a.png"), "static"), "/images/a.png")
+
+
+class TestFingerprintAssets(unittest.TestCase):
+    def test_fingerprint_assets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "images"))
+            with open(os.path.join(tmp, "index.css"), "wb") as f:
+                f.write(b"body {}")
+            with open(os.path.join(tmp, "images", "a.png"), "wb") as f:
+                f.write(b"png")
+            assets = fingerprint_assets(tmp, HashCache())
+            self.assertEqual(assets, {
+                "/index.css": f"/index.{hash_bytes(b'body {}')[:10]}.css",
+                "/images/a.png": f"/images/a.{hash_bytes(b'png')[:10]}.png",
+            })
+
+    def test_write_asset_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assets = {"/index.css": "/index.0123456789.css"}
+            self.assertTrue(write_asset_manifest(tmp, assets))
+            self.assertFalse(write_asset_manifest(tmp, assets))
+            with open(os.path.join(tmp, ASSET_MANIFEST_NAME)) as f:
+                self.assertEqual(json.load(f), assets)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os, tempfile
+import unittest
+
+from util import block_to_block_type, extract_title, markdown_to_blocks
+from benchmarks.compare import compare_results, corpus_differences, has_regressions
+from benchmarks.corpus import CorpusGenerator, generate_corpus, write_site
+from benchmarks.memory import count_nodes, measure_memory
+from util import markdown_to_html_node
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    def test_generate_corpus_deterministic(self):
+        self.assertEqual(generate_corpus(5, seed=1), generate_corpus(5, seed=1))
+        self.assertNotEqual(generate_corpus(5, seed=1), generate_corpus(5, seed=2))
+
+    def test_generate_corpus_pages(self):
+        corpus = generate_corpus(12)
+        self.assertEqual(len(corpus), 12)
+        self.assertIn(os.path.join("blog", "post1", "page11.md"), corpus)
+
+    def test_page_block_types(self):
+        generator = CorpusGenerator(blocks_per_page=30, mix={"unordered_list": 1})
+        page = generator.page("Lists")
+        self.assertEqual(extract_title(page), "Lists")
+        block_types = {block_to_block_type(block) for block in markdown_to_blocks(page)[1:]}
+        self.assertEqual(block_types, {"unordered_list"})
+
+    def test_each_block_type(self):
+        generator = CorpusGenerator()
+        for block_type in ("heading", "paragraph", "code", "quote", "unordered_list", "ordered_list"):
+            self.assertEqual(block_to_block_type(generator.block(block_type)), block_type)
+
+    def test_write_site(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_site(root, generate_corpus(3))
+            self.assertTrue(os.path.isfile(os.path.join(root, "template.html")))
+            self.assertTrue(os.path.isfile(os.path.join(root, "content", "blog", "post0", "page2.md")))
+
+
+class TestMemory(unittest.TestCase):
+    def test_count_nodes(self):
+        tree = markdown_to_html_node("# Title\n\n* a **b**\n* c")
+        # div, h1, text, ul, li, text, b, li, text
+        self.assertEqual(count_nodes(tree), 9)
+
+    def test_measure_memory(self):
+        result = measure_memory(pages=2)
+        self.assertGreater(result["html_nodes"], 0)
+        self.assertGreater(result["retained_bytes"], 0)
+
+
+class TestCompareResults(unittest.TestCase):
+    def results(self, **medians):
+        return {"results": {name: {"median": median} for name, median in medians.items()}}
+
+    def test_compare_results(self):
+        rows = compare_results(
+            self.results(parse=1.0, render=1.0),
+            self.results(parse=1.05, render=0.5, build=2.0)
+        )
+        self.assertEqual([(row[0], row[-1]) for row in rows], [("parse", "ok"), ("render", "improved"), ("build", "new")])
+        self.assertFalse(has_regressions(rows))
+
+    def test_compare_results_regression(self):
+        rows = compare_results(self.results(parse=1.0), self.results(parse=1.5), threshold=0.2)
+        self.assertTrue(has_regressions(rows))
+
+    def test_compare_results_different_corpus(self):
+        baseline = dict(self.results(parse=1.0), meta={"pages": 100, "seed": 0, "corpus_options": {"mix": None}, "python": "3.11"})
+        current = dict(self.results(parse=1.0), meta={"pages": 100, "seed": 0, "corpus_options": {"mix": None}, "python": "3.12"})
+        self.assertEqual(corpus_differences(baseline, current), [])
+        current["meta"] = dict(current["meta"], pages=200, corpus_options={"mix": {"paragraph": 1}})
+        self.assertEqual(corpus_differences(baseline, current), ["pages", "corpus_options"])
+        with self.assertRaisesRegex(ValueError, "pages, corpus_options"):
+            compare_results(baseline, current)
+        self.assertEqual(len(compare_results(baseline, current, allow_mismatch=True)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+
+from builder import SiteConfig, build_site
+from cache import HighlightCache
+from filesystem import MemoryFS
+from profiler import BuildProfile
+
+
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css"></head><body>{{ Content }}</body></html>'
+
+
+class TestBuildSite(unittest.TestCase):
+    def setUp(self):
+        self.fs = MemoryFS({
+            "template.html": TEMPLATE,
+            "content/index.md": "# Home\n\n[Tom](/blog/tom)",
+            "content/blog/tom/index.md": "# Tom\n\n![tom](/images/tom.png)",
+            "content/drafts/new.md": "# Draft",
+            "static/index.css": "body {}",
+            "static/images/tom.png": b"png",
+        })
+
+    def test_build_site(self):
+        result = build_site(SiteConfig(exclude=["drafts"]), self.fs)
+        self.assertListEqual(sorted(result.pages), ["docs/blog/tom/index.html", "docs/index.html"])
+        self.assertEqual(
+            result.pages["docs/index.html"],
+            '<html><head><title>Home</title><link href="/index.css"></head><body><div><h1>Home</h1><p><a href="/blog/tom">Tom</a></p></div></body></html>'
+        )
+        self.assertEqual(self.fs.files["docs/index.html"], result.pages["docs/index.html"])
+        self.assertListEqual(result.static, ["docs/images/tom.png", "docs/index.css"])
+        self.assertEqual(self.fs.read_bytes("docs/images/tom.png"), b"png")
+        self.assertEqual(result.stats["pages"], 2)
+        self.assertEqual(result.stats["static_files"], 2)
+
+    def test_build_site_config_dict_and_basepath(self):
+        result = build_site({"basepath": "/site/", "output": "public"}, self.fs)
+        html = result.pages["public/blog/tom/index.html"]
+        self.assertIn('<link href="/site/index.css">', html)
+        self.assertIn('<img src="/site/images/tom.png" alt="tom"></img>', html)
+
+    def test_build_site_no_title(self):
+        self.fs.write_text("content/broken.md", "no title")
+        with self.assertRaises(Exception):
+            build_site(SiteConfig(), self.fs)
+
+    def test_build_site_profile(self):
+        profile = BuildProfile()
+        build_site(SiteConfig(), self.fs, profile)
+        self.assertEqual(profile.phases["render"]["count"], 3)
+
+    def test_build_site_highlight_cache(self):
+        self.fs.write_text("content/code.md", "# Code\n\n```python\nprint(1)\n```")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HighlightCache(tmp)
+            first = build_site(SiteConfig(), self.fs, highlight_cache=cache)
+            second = build_site(SiteConfig(), self.fs, highlight_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIn('<span class="hl-builtin">print</span>', second.pages["docs/code.html"])
+        self.assertEqual(first.pages, second.pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os, tempfile
+import unittest
+
+from cache import HighlightCache, ParseCache, deserialize_document, serialize_document
+from document import parse_document
+
+
+MARKDOWN = """# Title
+
+Some **bold** text and a [link](/blog) with ![an image](/a.png).
+
+* one
+* two"""
+
+
+class TestSerializeDocument(unittest.TestCase):
+    def test_round_trip(self):
+        document = parse_document(MARKDOWN)
+        loaded = deserialize_document(serialize_document(document))
+        self.assertEqual(loaded.title, document.title)
+        self.assertEqual(loaded.root.to_html(), document.root.to_html())
+        self.assertEqual(repr(loaded.root), repr(document.root))
+        self.assertEqual(loaded.headings, document.headings)
+        self.assertEqual(loaded.links, document.links)
+        self.assertEqual(loaded.images, document.images)
+        self.assertEqual(loaded.text, document.text)
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "parse"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("abc"))
+        self.cache.put("abc", parse_document(MARKDOWN))
+        self.assertEqual(self.cache.get("abc").title, "Title")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.stats(), "Parse cache: 1 hits, 1 misses")
+
+    def test_corrupt_entry(self):
+        path = self.cache.path("abc")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not a cache entry")
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_trim_evicts_least_recently_used(self):
+        document = parse_document(MARKDOWN)
+        for num, source_hash in enumerate(["a", "b", "c"]):
+            self.cache.put(source_hash, document)
+            os.utime(self.cache.path(source_hash), (1000 + num, 1000 + num))
+        # Using "a" makes "b" the least recently used entry
+        self.cache.get("a")
+        size = os.path.getsize(self.cache.path("a"))
+        self.cache.max_bytes = 2 * size
+        removed, total = self.cache.trim()
+        self.assertEqual(removed, 1)
+        self.assertEqual(total, 2 * size)
+        self.assertFalse(os.path.exists(self.cache.path("b")))
+        self.assertTrue(os.path.exists(self.cache.path("a")))
+
+    def test_trim_missing_directory(self):
+        self.assertEqual(self.cache.trim(), (0, 0))
+
+
+class TestHighlightCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HighlightCache(os.path.join(self.tmp.name, "highlight"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("python", "x = 1"))
+        self.cache.put("python", "x = 1", "x = <span>1</span>")
+        self.assertEqual(self.cache.get("python", "x = 1"), "x = <span>1</span>")
+        self.assertEqual(self.cache.stats(), "Highlight cache: 1 hits, 1 misses")
+
+    def test_keyed_by_language(self):
+        self.cache.put("python", "x = 1", "python")
+        self.assertIsNone(self.cache.get("bash", "x = 1"))
+        self.assertNotEqual(self.cache.path("python", "x = 1"), self.cache.path("python", "x = 2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
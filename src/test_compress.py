@@ -0,0 +1,85 @@
+import gzip, os, tempfile
+import unittest
+
+from compress import compress_outputs, find_compressible, is_sidecar_current, remove_stale_sidecars
+
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.page = self.write("blog", "index.html", "<p>hello</p>" * 200)
+        self.css = self.write("index.css", "body {}" * 200)
+        self.small = self.write("contact", "index.html", "<p>hi</p>")
+        self.image = self.write("images", "a.png", "png" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, *parts):
+        path = os.path.join(self.tmp.name, *parts[:-1])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(parts[-1])
+        return path
+
+    def test_find_compressible(self):
+        files, orphans = find_compressible(self.tmp.name, min_size=1024)
+        self.assertListEqual(files, [self.page, self.css])
+        self.assertListEqual(orphans, [])
+
+    def test_compress_outputs(self):
+        compressed, skipped, removed = compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertListEqual(compressed, [self.page, self.css])
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(self.small + ".gz"))
+        self.assertFalse(os.path.exists(self.image + ".gz"))
+
+    def test_compress_outputs_skips_current(self):
+        compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertTrue(is_sidecar_current(self.page))
+        os.utime(self.css, (os.path.getmtime(self.css) + 10,) * 2)
+        compressed, skipped, removed = compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertListEqual(compressed, [self.css])
+        self.assertListEqual(skipped, [self.page])
+
+    def test_compress_outputs_older_replacement(self):
+        # A changed file whose mtime is older than the sidecar, as after cp -p
+        compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.write("index.css", "main {}" * 200)
+        os.utime(self.css, (1577836800, 1577836800))
+        compressed, _, _ = compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertListEqual(compressed, [self.css])
+        with gzip.open(self.css + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "main {}" * 200)
+
+    def test_compress_outputs_removes_orphans(self):
+        compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        os.remove(self.page)
+        compressed, skipped, removed = compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertListEqual(removed, [self.page + ".gz"])
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    def test_compress_outputs_parallel(self):
+        compressed, _, _ = compress_outputs(self.tmp.name, min_size=1024, jobs=2)
+        self.assertListEqual(compressed, [self.page, self.css])
+        self.assertTrue(os.path.exists(self.css + ".gz"))
+
+    def test_remove_stale_sidecars(self):
+        compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        os.remove(self.css)
+        self.write("blog", "index.html", "<p>changed</p>" * 200)
+        os.utime(self.page, ns=(0, 0))
+        other = self.write("other.png.gz", "not a sidecar")
+        self.assertListEqual(remove_stale_sidecars(self.tmp.name), sorted([self.page + ".gz", self.css + ".gz"]))
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertTrue(os.path.exists(other))
+
+    def test_remove_stale_sidecars_keeps_current(self):
+        compress_outputs(self.tmp.name, min_size=1024, jobs=1)
+        self.assertListEqual(remove_stale_sidecars(self.tmp.name), [])
+        self.assertTrue(is_sidecar_current(self.page))
+
+
+if __name__ == "__main__":
+    unittest.main()
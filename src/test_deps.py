@@ -0,0 +1,92 @@
+import os, tempfile
+import unittest
+
+from deps import DependencyGraph, find_source, local_site_path, page_url
+
+
+class TestLocalSitePath(unittest.TestCase):
+    def test_local_site_path(self):
+        self.assertEqual(local_site_path("/images/a.png", "/index.html"), "/images/a.png")
+        self.assertEqual(local_site_path("a.png?v=1#top", "/blog/tom/index.html"), "/blog/tom/a.png")
+        self.assertEqual(local_site_path("../majesty", "/blog/tom/index.html"), "/blog/majesty")
+
+    def test_local_site_path_external(self):
+        self.assertIsNone(local_site_path("https://boot.dev", "/index.html"))
+        self.assertIsNone(local_site_path("//cdn.example.com/a.js", "/index.html"))
+        self.assertIsNone(local_site_path("mailto:me@example.com", "/index.html"))
+        self.assertIsNone(local_site_path("#top", "/index.html"))
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "blog", "index.html"), "docs"), "/blog/index.html")
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.index = self.write(self.content, "index.md")
+        self.post = self.write(self.content, "blog", "post", "index.md")
+        self.image = self.write(self.static, "images", "a.png")
+        self.graph = DependencyGraph(os.path.join(self.tmp.name, "deps.json"), content_dir=self.content, static_dir=self.static, dest_dir=self.docs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, *parts):
+        path = os.path.join(*parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("x")
+        return path
+
+    def record_index(self):
+        dest = os.path.join(self.docs, "index.html")
+        urls = ["/images/a.png", "/blog/post", "https://boot.dev", "/missing", "/"]
+        self.graph.record_page(self.index, dest, "template.html", urls)
+
+    def test_find_source(self):
+        self.assertEqual(find_source("/images/a.png", self.content, self.static), ("asset", self.image))
+        self.assertEqual(find_source("/blog/post", self.content, self.static), ("link", self.post))
+        self.assertEqual(find_source("/", self.content, self.static), ("link", self.index))
+        self.assertIsNone(find_source("/missing", self.content, self.static))
+
+    def test_record_page(self):
+        self.record_index()
+        self.assertDictEqual(
+            self.graph.pages[self.index],
+            {"template": "template.html", "assets": [self.image], "links": [self.post],
+             "references": ["/", "/blog/post", "/images/a.png", "/missing"]}
+        )
+        self.assertListEqual(self.graph.dependencies(self.index), ["template.html", self.image, self.post])
+
+    def test_affected(self):
+        self.record_index()
+        self.assertListEqual(self.graph.affected([self.image]), [self.index])
+        self.assertListEqual(self.graph.affected(["template.html"]), [self.index])
+        # Linked pages don't change the output of pages that link to them
+        self.assertListEqual(self.graph.affected([self.post]), [])
+        self.assertListEqual(self.graph.dependents(self.post), [self.index])
+
+    def test_save_load(self):
+        self.record_index()
+        self.graph.save()
+        loaded = DependencyGraph.load(self.graph.path)
+        self.assertDictEqual(loaded.pages, self.graph.pages)
+
+    def test_load_corrupt(self):
+        with open(self.graph.path, "w") as f:
+            f.write("{not json")
+        self.assertDictEqual(DependencyGraph.load(self.graph.path).pages, {})
+
+    def test_prune(self):
+        self.record_index()
+        self.graph.prune({self.index})
+        self.assertListEqual(list(self.graph.pages), [self.index])
+        self.graph.prune(set())
+        self.assertDictEqual(self.graph.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+from document import Document, parse_blocks, parse_document, stream_document
+from util import extract_title, markdown_to_blocks, markdown_to_html_node
+
+
+MARKDOWN = """## Before the title
+
+# My **title**
+
+Some text with a [link](/blog) and ![an image](/images/a.png).
+
+* item [two](https://boot.dev)
+
+### Sub heading"""
+
+
+class DictCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, language, code):
+        return self.entries.get((language, code))
+
+    def put(self, language, code, html):
+        self.entries[(language, code)] = html
+
+
+class TestParseDocument(unittest.TestCase):
+    def test_parse_document_title(self):
+        document = parse_document(MARKDOWN)
+        self.assertEqual(document.title, extract_title(MARKDOWN))
+
+    def test_parse_document_root(self):
+        document = parse_document(MARKDOWN)
+        self.assertEqual(document.root.to_html(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_parse_document_headings(self):
+        document = parse_document(MARKDOWN)
+        self.assertListEqual(
+            document.headings,
+            [(2, "Before the title"), (1, "My title"), (3, "Sub heading")]
+        )
+
+    def test_parse_document_links_and_images(self):
+        document = parse_document(MARKDOWN)
+        self.assertListEqual(document.links, [("link", "/blog"), ("two", "https://boot.dev")])
+        self.assertListEqual(document.images, [("an image", "/images/a.png")])
+
+    def test_parse_document_text(self):
+        document = parse_document(MARKDOWN)
+        self.assertListEqual(
+            document.text,
+            ["Before the title", "My title", "Some text with a link and .", "item two", "Sub heading"]
+        )
+
+    def test_parse_document_no_title(self):
+        document = parse_document("## Only a subheading")
+        self.assertIsNone(document.title)
+
+    def test_parse_blocks(self):
+        document = parse_blocks(markdown_to_blocks(MARKDOWN))
+        self.assertIsInstance(document, Document)
+        self.assertEqual(len(document.root.children), 5)
+
+
+class TestStreamDocument(unittest.TestCase):
+    def test_stream_document_matches_parse_document(self):
+        title, chunks = stream_document(markdown_to_blocks(MARKDOWN))
+        document = parse_document(MARKDOWN)
+        self.assertEqual(title, document.title)
+        self.assertEqual("".join(chunks), document.root.to_html())
+
+    def test_stream_document_is_lazy(self):
+        blocks = iter(["# Title", "after"])
+        title, chunks = stream_document(blocks)
+        self.assertEqual(title, "Title")
+        self.assertEqual(list(blocks), ["after"])
+        self.assertEqual("".join(chunks), "<div><h1>Title</h1></div>")
+
+    def test_stream_document_collects_document(self):
+        document = Document()
+        title, chunks = stream_document(markdown_to_blocks(MARKDOWN), document=document)
+        "".join(chunks)
+        parsed = parse_document(MARKDOWN)
+        self.assertListEqual(document.headings, parsed.headings)
+        self.assertListEqual(document.links, parsed.links)
+        self.assertListEqual(document.images, parsed.images)
+        self.assertListEqual(document.text, parsed.text)
+
+    def test_stream_document_highlight_cache(self):
+        cache = DictCache()
+        markdown = "# Title\n\n```py\nx = 1\n```"
+        title, chunks = stream_document(markdown_to_blocks(markdown), highlight_cache=cache)
+        self.assertEqual("".join(chunks), parse_document(markdown).root.to_html())
+        self.assertListEqual(list(cache.entries), [("python", "x = 1")])
+        cache.entries[("python", "x = 1")] = "cached"
+        self.assertIn('<code class="language-py">cached</code>', parse_document(markdown, cache).root.to_html())
+
+    def test_stream_document_no_title(self):
+        title, chunks = stream_document(["## Sub", "text"])
+        self.assertIsNone(title)
+        self.assertEqual("".join(chunks), "<div><h2>Sub</h2><p>text</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os, tempfile
+import unittest
+
+from filesystem import DiskFS, MemoryFS
+
+
+class TestMemoryFS(unittest.TestCase):
+    def setUp(self):
+        self.fs = MemoryFS({
+            "content/index.md": "# Home",
+            "content/blog/tom/index.md": "# Tom",
+            "content/blog.md": "# Blog",
+            "content/drafts/new.md": "# New",
+            "static/a.png": b"png",
+        })
+
+    def test_read(self):
+        self.assertEqual(self.fs.read_text("content/index.md"), "# Home")
+        self.assertEqual(self.fs.read_bytes("content/index.md"), b"# Home")
+        self.assertEqual(self.fs.read_text("./static/../static/a.png"), "png")
+
+    def test_write_and_copy(self):
+        self.fs.write_text("docs/index.html", "<p>hi</p>")
+        self.fs.copy("static/a.png", "docs/a.png")
+        self.assertEqual(self.fs.files["docs/index.html"], "<p>hi</p>")
+        self.assertEqual(self.fs.read_bytes("docs/a.png"), b"png")
+
+    def test_iter_files(self):
+        self.assertListEqual(
+            list(self.fs.iter_files("content")),
+            ["blog/tom/index.md", "blog.md", "drafts/new.md", "index.md"]
+        )
+
+    def test_iter_files_globs(self):
+        self.assertListEqual(list(self.fs.iter_files("content", include=("index.md",), exclude=("drafts",))), ["blog/tom/index.md", "index.md"])
+        self.assertListEqual(list(self.fs.iter_files("content", exclude=("blog/*",))), ["blog.md", "drafts/new.md", "index.md"])
+
+    def test_iter_files_matches_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            disk = DiskFS(tmp)
+            for path in self.fs.files:
+                os.makedirs(os.path.dirname(disk.path(path)), exist_ok=True)
+                with open(disk.path(path), "wb") as f:
+                    f.write(self.fs.read_bytes(path))
+            self.assertListEqual(list(disk.iter_files("content")), list(self.fs.iter_files("content")))
+
+
+class TestDiskFS(unittest.TestCase):
+    def test_disk_fs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fs = DiskFS(tmp)
+            fs.write_text("docs/blog/index.html", "<p>hi</p>")
+            fs.copy("docs/blog/index.html", "docs/copy.html")
+            self.assertEqual(fs.read_text("docs/copy.html"), "<p>hi</p>")
+            self.assertListEqual(list(fs.iter_files("docs")), ["blog/index.html", "copy.html"])
+
+    def test_disk_fs_copy_skips_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fs = DiskFS(tmp)
+            fs.write_text("static/a.css", "a {}")
+            self.assertTrue(fs.copy("static/a.css", "docs/a.css"))
+            self.assertFalse(fs.copy("static/a.css", "docs/a.css"))
+            fs.write_text("static/a.css", "b {}")
+            self.assertTrue(fs.copy("static/a.css", "docs/a.css"))
+            self.assertEqual(fs.read_text("docs/a.css"), "b {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
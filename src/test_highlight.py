@@ -0,0 +1,64 @@
+import unittest
+
+from highlight import LEXERS, highlight as highlight_code, tokenize
+
+
+class RecordingCache:
+    def __init__(self):
+        self.entries = {}
+        self.gets = 0
+
+    def get(self, language, code):
+        self.gets += 1
+        return self.entries.get((language, code))
+
+    def put(self, language, code, html):
+        self.entries[(language, code)] = html
+
+
+class TestTokenize(unittest.TestCase):
+    def test_covers_all_of_code(self):
+        code = 'def f(x):\n    return "a" + 1  # done\n'
+        self.assertEqual("".join(text for _, text in tokenize(code, LEXERS["python"])), code)
+
+    def test_python_tokens(self):
+        tokens = [(token_type, text) for token_type, text in tokenize('if name: print(rb"x")  # c', LEXERS["python"]) if token_type]
+        self.assertEqual(tokens, [("keyword", "if"), ("builtin", "print"), ("string", 'rb"x"'), ("comment", "# c")])
+
+    def test_keywords_inside_names(self):
+        tokens = [token_type for token_type, _ in tokenize("format iffy", LEXERS["python"])]
+        self.assertNotIn("keyword", tokens)
+
+    def test_json_keys(self):
+        tokens = [(token_type, text) for token_type, text in tokenize('{"a": "b"}', LEXERS["json"]) if token_type]
+        self.assertEqual(tokens, [("attribute", '"a"'), ("string", '"b"')])
+
+
+class TestHighlight(unittest.TestCase):
+    def test_highlight(self):
+        self.assertEqual(
+            highlight_code("let x = 1 // one", "js"),
+            '<span class="hl-keyword">let</span> x = <span class="hl-number">1</span> <span class="hl-comment">// one</span>'
+        )
+
+    def test_escapes_code(self):
+        self.assertEqual(
+            highlight_code('<a href="x">', "html"),
+            '<span class="hl-tag">&lt;a</span> <span class="hl-attribute">href</span>=<span class="hl-string">"x"</span><span class="hl-tag">&gt;</span>'
+        )
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight_code("+[-]", "brainfuck"))
+
+    def test_cache(self):
+        cache = RecordingCache()
+        html = highlight_code("echo $HOME", "sh", cache)
+        self.assertEqual(list(cache.entries), [("bash", "echo $HOME")])
+        cache.entries[("bash", "echo $HOME")] = "cached"
+        self.assertEqual(highlight_code("echo $HOME", "bash", cache), "cached")
+        self.assertEqual(cache.gets, 2)
+        self.assertNotEqual(html, "cached")
+
+
+if __name__ == "__main__":
+    unittest.main()
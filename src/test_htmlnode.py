@@ -1,6 +1,8 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from urls import BasepathResolver
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -26,6 +28,14 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode("a", "link", None, None)
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_to_html_resolve_url(self):
+        node = HTMLNode("img", "", None, {"src": "/a.png", "alt": "/a.png"})
+        self.assertEqual(node.props_to_html(BasepathResolver("/site/")), ' src="/site/a.png" alt="/a.png"')
+
+    def test_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "bold"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestLeafNode(unittest.TestCase):
     def test_leafnode(self):
@@ -131,6 +141,36 @@ class TestParentNode(unittest.TestCase):
         )
         self.assertEqual(node.to_html(), "<body><p><i>Italicized text</i></p></body>")
 
+    def test_parentnode_iter_html(self):
+        node = ParentNode("p", [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")])
+        self.assertListEqual(
+            list(node.iter_html()),
+            ["<p>", "<b>Bold text</b>", "Normal text", "</p>"]
+        )
+
+    def test_parentnode_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("b", "Item")])])
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), "<ul><li><b>Item</b></li></ul>")
+
+    def test_parentnode_to_html_deeply_nested(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * 5000 + "x" + "</span>" * 5000)
+
+    def test_parentnode_to_html_resolve_url(self):
+        node = ParentNode("p", [LeafNode("a", "home", {"href": "/"}), LeafNode("code", 'href="/"')])
+        self.assertEqual(
+            node.to_html(BasepathResolver("/site/")),
+            '<p><a href="/site/">home</a><code>href="/"</code></p>'
+        )
+
+    def test_parentnode_to_html_nested_no_tag(self):
+        node = ParentNode("p", [ParentNode(None, [LeafNode(None, "x")])])
+        self.assertRaises(ValueError, node.to_html)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,342 @@
+import contextlib, io, json, os, tempfile
+import unittest
+from unittest import mock
+
+import main
+from template import Template
+
+
+TEMPLATE = """<html>
+<head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet"></head>
+<body>{{ Content }}</body>
+</html>
+"""
+
+
+class SiteTestCase(unittest.TestCase):
+    # Each test runs in a fresh site directory, since build() works on the
+    # current directory's content/, static/ and template.html
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.write("template.html", TEMPLATE)
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+        self.write("content/index.md", "# Home\n\nSee [the post](/blog/post) and ![a](/images/a.png).")
+        self.write("content/blog/post.md", "# Post\n\nSome **bold** text.\n\n```python\nprint(1)\n```")
+        self.write("content/blog/other.md", "# Other\n\nBack [home](/).")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path, "r") as f:
+            return f.read()
+
+    def build(self, *args, **kwargs):
+        # Returns what the build printed
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            main.build(*args, **kwargs)
+        return log.getvalue()
+
+    def generated(self, log):
+        return [line.split()[3] for line in log.splitlines() if line.startswith("Generating page from ")]
+
+    def changed(self):
+        with open(main.CHANGED_PATH, "r") as f:
+            return json.load(f)
+
+
+class TestBuild(SiteTestCase):
+    def test_build_writes_pages(self):
+        log = self.build({"basepath": "/site/"})
+        self.assertEqual(sorted(self.generated(log)), ["content/blog/other.md", "content/blog/post.md", "content/index.md"])
+        self.assertIn('<a href="/site/blog/post">the post</a>', self.read("docs/index.html"))
+        self.assertIn('<link href="/site/index.css"', self.read("docs/blog/post.html"))
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        log = self.build()
+        self.assertEqual(self.generated(log), [])
+        self.assertEqual(self.changed(), {"added": [], "modified": [], "removed": []})
+
+    def test_edited_page_is_rebuilt(self):
+        self.build()
+        self.write("content/blog/post.md", "# Post\n\nEdited.")
+        log = self.build()
+        self.assertEqual(self.generated(log), ["content/blog/post.md"])
+        self.assertIn("Edited.", self.read("docs/blog/post.html"))
+        self.assertEqual(self.changed()["modified"], ["blog/post.html"])
+
+    def test_template_change_rebuilds_every_page(self):
+        self.build()
+        self.write("template.html", TEMPLATE.replace("<body>", "<body class=\"new\">"))
+        log = self.build()
+        self.assertEqual(len(self.generated(log)), 3)
+        self.assertIn('<body class="new">', self.read("docs/blog/other.html"))
+
+    def test_basepath_change_rebuilds_every_page(self):
+        self.build({"basepath": "/"})
+        log = self.build({"basepath": "/site/"})
+        self.assertEqual(len(self.generated(log)), 3)
+
+    def test_removed_source_removes_page(self):
+        self.build()
+        os.remove("content/blog/other.md")
+        log = self.build()
+        self.assertEqual(self.generated(log), [])
+        self.assertFalse(os.path.exists("docs/blog/other.html"))
+        self.assertTrue(os.path.exists("docs/blog/post.html"))
+        self.assertEqual(self.changed()["removed"], ["blog/other.html"])
+
+    def test_clean_rebuilds_everything(self):
+        self.build()
+        log = self.build(clean=True)
+        self.assertEqual(len(self.generated(log)), 3)
+
+    def test_failed_page_is_retried(self):
+        # content/blog/ is walked before content/index.md
+        self.write("content/index.md", "No title here.")
+        with self.assertRaises(Exception):
+            self.build()
+        self.assertTrue(os.path.exists("docs/blog/post.html"))
+        self.write("content/index.md", "# Home\n\nFixed.")
+        log = self.build()
+        self.assertEqual(self.generated(log), ["content/index.md"])
+
+    def test_only_limits_generated_pages(self):
+        self.build()
+        self.write("content/index.md", "# Home\n\nChanged.")
+        self.write("content/blog/post.md", "# Post\n\nChanged.")
+        log = self.build(only={os.path.join("content", "blog", "post.md")})
+        self.assertEqual(self.generated(log), ["content/blog/post.md"])
+        # Pages outside of only are kept rather than removed as stale
+        self.assertTrue(os.path.exists("docs/index.html"))
+        self.assertEqual(self.generated(self.build()), ["content/index.md"])
+
+    def test_exclude_removes_page(self):
+        self.build()
+        self.build({"exclude": ["other.md"]})
+        self.assertFalse(os.path.exists("docs/blog/other.html"))
+
+    def test_fingerprinted_asset_change_rebuilds_referencing_pages(self):
+        self.build(fingerprint=True)
+        before = self.read("docs/index.html")
+        self.write("static/images/a.png", "new png")
+        log = self.build(fingerprint=True)
+        # other.md refers to no changed asset
+        self.assertEqual(self.generated(log), ["content/index.md"])
+        self.assertNotEqual(before, self.read("docs/index.html"))
+        with open(os.path.join("docs", main.ASSET_MANIFEST_NAME), "r") as f:
+            assets = json.load(f)
+        self.assertIn('src="' + assets["/images/a.png"] + '"', self.read("docs/index.html"))
+
+    def test_asset_added_after_page_rebuilds_it(self):
+        self.write("content/blog/other.md", "# Other\n\n![new](/images/new.png)")
+        self.build(fingerprint=True)
+        self.assertIn('src="/images/new.png"', self.read("docs/blog/other.html"))
+        self.write("static/images/new.png", "new png")
+        log = self.build(fingerprint=True)
+        self.assertEqual(self.generated(log), ["content/blog/other.md"])
+        self.assertNotIn('src="/images/new.png"', self.read("docs/blog/other.html"))
+
+    def test_page_edited_without_search_is_reindexed(self):
+        self.build(search=True)
+        self.write("content/blog/post.md", "# Post\n\nBombadil.")
+        self.build()
+        log = self.build(search=True)
+        self.assertEqual(self.generated(log), ["content/blog/post.md"])
+        index = main.SearchIndex.load(main.SEARCH_PATH)
+        self.assertIn("bombadil", index.pages[os.path.join("content", "blog", "post.md")]["terms"])
+        self.assertTrue(os.path.exists(os.path.join("docs", "search", "terms", "bo.json")))
+
+    def test_build_without_gzip_removes_stale_sidecars(self):
+        self.write("content/blog/post.md", "# Post\n\n" + "Long text. " * 200)
+        self.build(gzip_min_size=0)
+        self.assertTrue(os.path.exists("docs/blog/post.html.gz"))
+        self.assertTrue(os.path.exists("docs/blog/other.html.gz"))
+        self.write("content/blog/post.md", "# Post\n\n" + "Edited text. " * 200)
+        os.remove("content/blog/other.md")
+        self.build()
+        self.assertFalse(os.path.exists("docs/blog/post.html.gz"))
+        self.assertFalse(os.path.exists("docs/blog/other.html.gz"))
+        self.assertTrue(os.path.exists("docs/index.html.gz"))
+        self.assertIn("blog/post.html.gz", self.changed()["removed"])
+        self.assertIn("blog/other.html.gz", self.changed()["removed"])
+
+    def test_site_config_layout(self):
+        os.rename("content", "pages")
+        os.rename("template.html", "layout.html")
+        config = {"content": "pages", "template": "layout.html", "output": "public", "basepath": "/site/"}
+        self.build(config, search=True)
+        self.assertIn('<link href="/site/index.css"', self.read("public/blog/post.html"))
+        self.assertEqual(self.read("public/index.css"), "body {}")
+        self.assertTrue(os.path.exists("public/search/index.json"))
+        self.assertFalse(os.path.exists("docs"))
+        graph = main.DependencyGraph.load(main.DEPS_PATH)
+        self.assertEqual(graph.pages[os.path.join("pages", "index.md")]["links"], [os.path.join("pages", "blog", "post.md")])
+        self.assertEqual(self.generated(self.build(config, search=True)), [])
+
+    def test_page_asset_names(self):
+        self.build(fingerprint=True)
+        graph = main.DependencyGraph.load(main.DEPS_PATH)
+        assets = {"/images/a.png": "/images/a.1234.png", "/index.css": "/index.5678.css"}
+        self.assertEqual(main.page_asset_names(graph, os.path.join("content", "index.md"), assets),
+                         {"/blog/post": None, "/images/a.png": "/images/a.1234.png"})
+        self.assertEqual(main.page_asset_names(graph, os.path.join("content", "blog", "other.md"), assets), {"/": None})
+        self.assertEqual(main.page_asset_names(graph, os.path.join("content", "new.md"), assets), {})
+
+
+class TestParallelBuild(SiteTestCase):
+    def outputs(self):
+        # Every file under docs/ and the dependency and search caches
+        files = {}
+        for directory in ("docs", main.CACHE_DIR):
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    if directory == "docs" or path in (main.DEPS_PATH, main.SEARCH_PATH):
+                        files[path] = self.read(path)
+        return files
+
+    def test_matches_serial_build(self):
+        serial_log = self.build({"basepath": "/site/"}, search=True, fingerprint=True)
+        serial = self.outputs()
+        parallel_log = self.build({"basepath": "/site/"}, jobs=2, clean=True, search=True, fingerprint=True)
+        self.assertEqual(self.outputs(), serial)
+        # Workers' output is replayed in page order
+        self.assertEqual(self.generated(parallel_log), self.generated(serial_log))
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build(jobs=2)
+        self.assertEqual(self.generated(self.build(jobs=2)), [])
+
+    def test_first_error_is_raised(self):
+        self.write("content/blog/other.md", "No title here.")
+        self.write("content/index.md", "Nor here.")
+        with self.assertRaisesRegex(Exception, "title"):
+            self.build(jobs=2)
+        # The pages that did succeed are kept and recorded
+        self.assertTrue(os.path.exists("docs/blog/post.html"))
+        self.write("content/blog/other.md", "# Other")
+        self.write("content/index.md", "# Home")
+        self.assertEqual(sorted(self.generated(self.build(jobs=2))), ["content/blog/other.md", "content/index.md"])
+
+    def test_profile_and_caches_are_merged(self):
+        profile = main.BuildProfile()
+        parse_cache = main.ParseCache(main.PARSE_CACHE_DIR)
+        highlight_cache = main.HighlightCache(main.HIGHLIGHT_CACHE_DIR)
+        self.build(jobs=2, profile=profile, parse_cache=parse_cache, highlight_cache=highlight_cache)
+        self.assertEqual(sorted(page["path"] for page in profile.to_dict()["pages"]),
+                         ["content/blog/other.md", "content/blog/post.md", "content/index.md"])
+        self.assertEqual(parse_cache.misses, 3)
+        self.assertEqual(highlight_cache.misses, 1)
+        self.build(jobs=2, clean=True, parse_cache=parse_cache, highlight_cache=highlight_cache)
+        self.assertEqual(parse_cache.hits, 3)
+
+
+class TestGeneratePage(SiteTestCase):
+    def generate(self, dest_path, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.generate_page("content/blog/post.md", "template.html", dest_path, "/site/", **kwargs)
+        return self.read(dest_path)
+
+    def test_streaming_matches_buffered(self):
+        buffered = self.generate("out/buffered.html")
+        self.assertEqual(self.generate("out/streamed.html", stream_threshold=0), buffered)
+
+    def test_streaming_records_dependencies_and_search(self):
+        graph = main.DependencyGraph(None)
+        search = main.SearchIndex(None)
+        self.generate("docs/blog/post.html", stream_threshold=0, graph=graph, search=search)
+        self.assertIn("content/blog/post.md", graph.pages)
+        self.assertIn("content/blog/post.md", search.pages)
+
+    def test_streaming_without_title(self):
+        self.write("content/blog/post.md", "No title here.")
+        with self.assertRaisesRegex(Exception, "title"):
+            self.generate("out/streamed.html", stream_threshold=0)
+
+    def test_profile_records_output_size(self):
+        for name, writer in (("direct", None), ("writer", main.OutputWriter())):
+            profile = main.BuildProfile()
+            dest_path = os.path.join("out", name + ".html")
+            with contextlib.redirect_stdout(io.StringIO()):
+                written = main.generate_page("content/blog/post.md", "template.html", dest_path, "/", profile=profile, writer=writer)
+            if writer is not None:
+                writer.close()
+                self.assertTrue(written.result())
+            self.assertEqual(profile.to_dict()["bytes_out"], os.path.getsize(dest_path))
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir("out")), ["direct.html", "writer.html"])
+
+    def test_template_is_reused(self):
+        template = Template("<p>{{ Title }}</p>")
+        self.assertEqual(self.generate("out/page.html", template=template), "<p>Post</p>")
+
+
+class TestServeRebuild(SiteTestCase):
+    def start(self):
+        # serve_main builds once and hands its rebuild callback to serve()
+        with mock.patch("main.serve") as serve, contextlib.redirect_stdout(io.StringIO()):
+            main.serve_main([])
+        return serve.call_args[0][0]
+
+    def rebuild(self, rebuild, changed):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            rebuild(changed)
+        return self.generated(log.getvalue())
+
+    def test_initial_build(self):
+        self.start()
+        self.assertTrue(os.path.exists("docs/blog/post.html"))
+
+    def test_changed_source_rebuilds_it(self):
+        rebuild = self.start()
+        self.write("content/blog/post.md", "# Post\n\nEdited.")
+        self.assertEqual(self.rebuild(rebuild, [os.path.join("content", "blog", "post.md")]), ["content/blog/post.md"])
+        self.assertIn("Edited.", self.read("docs/blog/post.html"))
+
+    def test_new_source_is_built(self):
+        rebuild = self.start()
+        self.write("content/blog/new.md", "# New")
+        self.assertEqual(self.rebuild(rebuild, [os.path.join("content", "blog", "new.md")]), ["content/blog/new.md"])
+        self.assertTrue(os.path.exists("docs/blog/new.html"))
+
+    def test_deleted_source_is_removed(self):
+        rebuild = self.start()
+        os.remove("content/blog/other.md")
+        self.assertEqual(self.rebuild(rebuild, [os.path.join("content", "blog", "other.md")]), [])
+        self.assertFalse(os.path.exists("docs/blog/other.html"))
+        self.assertTrue(os.path.exists("docs/index.html"))
+
+    def test_changed_template_rebuilds_every_page(self):
+        rebuild = self.start()
+        self.write("template.html", TEMPLATE.replace("<body>", "<body class=\"new\">"))
+        self.assertEqual(len(self.rebuild(rebuild, ["template.html"])), 3)
+
+    def test_static_change_copies_without_pages(self):
+        rebuild = self.start()
+        self.write("static/index.css", "body { color: red }")
+        self.assertEqual(self.rebuild(rebuild, [os.path.join("static", "index.css")]), [])
+        self.assertEqual(self.read("docs/index.css"), "body { color: red }")
+
+    def test_without_graph_rebuilds_everything(self):
+        rebuild = self.start()
+        os.remove(main.DEPS_PATH)
+        self.write("content/blog/post.md", "# Post\n\nEdited.")
+        self.assertEqual(self.rebuild(rebuild, [os.path.join("content", "blog", "post.md")]), ["content/blog/post.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os, tempfile
+import unittest
+
+from manifest import BuildManifest, HashCache, hash_bytes, hash_file
+
+
+class TestHashFile(unittest.TestCase):
+    def test_hash_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "wb") as f:
+                f.write(b"# Title")
+            self.assertEqual(hash_file(path), hash_bytes(b"# Title"))
+
+
+class TestHashCache(unittest.TestCase):
+    def test_hash_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "wb") as f:
+                f.write(b"# Title")
+            hasher = HashCache()
+            self.assertEqual(hasher(path), hash_bytes(b"# Title"))
+            with open(path, "wb") as f:
+                f.write(b"# Other title")
+            self.assertEqual(hasher(path), hash_bytes(b"# Other title"))
+            self.assertEqual(len(hasher.entries), 1)
+
+    def test_hash_cache_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            cache_path = os.path.join(tmp, ".cache", "hashes.json")
+            with open(path, "wb") as f:
+                f.write(b"# Title")
+            hasher = HashCache(cache_path)
+            hasher(path)
+            hasher.save()
+            loaded = HashCache.load(cache_path)
+            self.assertEqual(loaded.entries, hasher.entries)
+            # A cached entry is used without reading the file again
+            key, _ = loaded.entries[path]
+            loaded.entries[path] = (key, "cached")
+            self.assertEqual(loaded(path), "cached")
+
+    def test_hash_cache_load_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "hashes.json")
+            with open(cache_path, "w") as f:
+                f.write("{not json")
+            self.assertEqual(HashCache.load(cache_path).entries, {})
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmp.name, ".cache", "manifest.json")
+        self.dest_path = os.path.join(self.tmp.name, "index.html")
+        with open(self.dest_path, "w") as f:
+            f.write("<p>hi</p>")
+        self.inputs = {"source": "a", "template": "b", "basepath": "/"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_missing(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_load_corrupt(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(BuildManifest.load(self.manifest_path).pages, {})
+
+    def test_is_current_after_save(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.is_current("index.md", self.dest_path, self.inputs))
+        manifest.record("index.md", self.dest_path, self.inputs)
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.is_current("index.md", self.dest_path, self.inputs))
+
+    def test_is_current_changed_inputs(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record("index.md", self.dest_path, self.inputs)
+        changed = dict(self.inputs, basepath="/site/")
+        self.assertFalse(manifest.is_current("index.md", self.dest_path, changed))
+
+    def test_is_current_missing_output(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record("index.md", self.dest_path, self.inputs)
+        os.remove(self.dest_path)
+        self.assertFalse(manifest.is_current("index.md", self.dest_path, self.inputs))
+
+    def test_remove_stale_pages(self):
+        manifest = BuildManifest(self.manifest_path, {"gone.md": {"dest": self.dest_path, "inputs": self.inputs}})
+        self.assertEqual(manifest.remove_stale_pages(), [self.dest_path])
+        self.assertFalse(os.path.exists(self.dest_path))
+        self.assertEqual(manifest.pages, {})
+
+    def test_remove_stale_pages_keeps_seen(self):
+        manifest = BuildManifest(self.manifest_path, {"index.md": {"dest": self.dest_path, "inputs": self.inputs}})
+        manifest.is_current("index.md", self.dest_path, self.inputs)
+        self.assertEqual(manifest.remove_stale_pages(), [])
+        self.assertTrue(os.path.exists(self.dest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os, tempfile
+import unittest
+
+from manifest import hash_bytes
+from outputs import OutputState
+from writer import write_file
+
+
+class TestOutputState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.state = OutputState(os.path.join(self.tmp.name, "outputs.json"))
+        self.page = self.write("index.html", b"<p>hi</p>")
+        self.css = self.write("index.css", b"body {}")
+        self.state.refresh(self.docs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.docs, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_refresh_first_build(self):
+        state = OutputState()
+        self.assertDictEqual(state.refresh(self.docs), {"added": ["index.css", "index.html"], "modified": [], "removed": []})
+
+    def test_refresh_changes(self):
+        self.write("index.html", b"<p>ho</p>")
+        self.write("new.html", b"new")
+        os.remove(self.css)
+        self.assertDictEqual(self.state.refresh(self.docs), {"added": ["new.html"], "modified": ["index.html"], "removed": ["index.css"]})
+        self.assertDictEqual(self.state.refresh(self.docs), {"added": [], "modified": [], "removed": []})
+
+    def test_refresh_rewritten_with_same_content(self):
+        os.remove(self.page)
+        self.write("index.html", b"<p>hi</p>")
+        self.assertDictEqual(self.state.refresh(self.docs), {"added": [], "modified": [], "removed": []})
+
+    def test_is_identical_uses_stored_hash(self):
+        self.assertTrue(self.state.is_identical(self.page, hash_bytes(b"<p>hi</p>")))
+        self.assertFalse(self.state.is_identical(self.page, hash_bytes(b"<p>ho</p>")))
+        self.assertIsNone(self.state.is_identical(os.path.join(self.docs, "other.html"), hash_bytes(b"")))
+
+    def test_write_file_with_state(self):
+        os.utime(self.page, ns=(0, 0))
+        self.state.refresh(self.docs)
+        self.assertFalse(write_file(self.page, b"<p>hi</p>", self.state))
+        self.assertTrue(write_file(self.page, b"<p>ho</p>", self.state))
+        self.assertTrue(write_file(os.path.join(self.docs, "new.html"), b"new", self.state))
+        self.assertDictEqual(self.state.refresh(self.docs), {"added": ["new.html"], "modified": ["index.html"], "removed": []})
+
+    def test_save_load(self):
+        self.state.save()
+        self.assertDictEqual(OutputState.load(self.state.path).files, self.state.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json, os, tempfile
+import unittest
+
+from profiler import NULL_PROFILE, PHASES, BuildProfile
+
+
+class TestBuildProfile(unittest.TestCase):
+    def test_phase(self):
+        profile = BuildProfile()
+        with profile.phase("read"):
+            pass
+        with profile.phase("read"):
+            pass
+        self.assertEqual(profile.phases["read"]["count"], 2)
+        self.assertGreaterEqual(profile.phases["read"]["seconds"], 0.0)
+        self.assertEqual(list(profile.phases), list(PHASES))
+
+    def test_phase_error(self):
+        profile = BuildProfile()
+        with self.assertRaises(ValueError):
+            with profile.phase("write"):
+                raise ValueError
+        self.assertEqual(profile.phases["write"]["count"], 1)
+
+    def test_merge(self):
+        worker = BuildProfile()
+        worker.add("render", 0.5)
+        worker.record_page("a.md", 0.5, 10, 20)
+        profile = BuildProfile()
+        profile.add("render", 0.25)
+        profile.merge(worker.to_dict())
+        self.assertEqual(profile.phases["render"], {"seconds": 0.75, "count": 2})
+        self.assertEqual(profile.to_dict()["bytes_out"], 20)
+
+    def test_pages_sorted_slowest_first(self):
+        profile = BuildProfile()
+        profile.record_page("fast.md", 0.1, 1, 1)
+        profile.record_page("slow.md", 0.9, 1, 1)
+        self.assertEqual([page["path"] for page in profile.to_dict()["pages"]], ["slow.md", "fast.md"])
+        self.assertIn("slow.md", profile.format_table(slowest=1))
+        self.assertNotIn("fast.md", profile.format_table(slowest=1))
+
+    def test_write_json(self):
+        profile = BuildProfile()
+        profile.record_page("a.md", 0.1, 3, 4)
+        profile.finish()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            profile.write_json(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data["page_count"], 1)
+        self.assertEqual(data["bytes_in"], 3)
+
+    def test_null_profile(self):
+        self.assertFalse(NULL_PROFILE.enabled)
+        with NULL_PROFILE.phase("read"):
+            pass
+        NULL_PROFILE.record_page("a.md", 0.1, 1, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
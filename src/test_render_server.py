@@ -0,0 +1,121 @@
+import json, tempfile, threading
+import unittest
+from http.client import HTTPConnection
+
+from cache import HighlightCache
+from render_server import RenderCache, RenderService, make_render_server
+from util import markdown_to_html_node
+
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+MARKDOWN = "# Title\n\nSome **bold** [text](/blog)"
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = RenderCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1, 1))
+
+
+class TestRenderService(unittest.TestCase):
+    def setUp(self):
+        self.service = RenderService(TEMPLATE, basepath="/site/", max_entries=8)
+
+    def test_render_fragment(self):
+        html, cached = self.service.render(MARKDOWN)
+        self.assertEqual(html, markdown_to_html_node(MARKDOWN).to_html(self.service.resolve_url))
+        self.assertFalse(cached)
+        self.assertEqual(self.service.render(MARKDOWN), (html, True))
+
+    def test_render_page(self):
+        html, _ = self.service.render(MARKDOWN, "page")
+        self.assertTrue(html.startswith('<title>Title</title><link href="/site/index.css"><div><h1>Title</h1>'))
+        # Cached separately from the fragment
+        self.assertFalse(self.service.render(MARKDOWN)[1])
+
+    def test_render_highlight_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HighlightCache(tmp)
+            service = RenderService(highlight_cache=cache)
+            html, _ = service.render("```python\nprint(1)\n```")
+            RenderService(highlight_cache=cache).render("```python\nprint(1)\n```")
+        self.assertIn('<span class="hl-builtin">print</span>', html)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_render_errors(self):
+        with self.assertRaises(ValueError):
+            self.service.render("no title", "page")
+        with self.assertRaises(ValueError):
+            self.service.render(MARKDOWN, "other")
+        with self.assertRaises(ValueError):
+            RenderService().render(MARKDOWN, "page")
+
+    def test_stats(self):
+        self.service.render(MARKDOWN)
+        self.service.render(MARKDOWN)
+        stats = self.service.stats()
+        self.assertEqual(stats["cache"]["hits"], 1)
+        self.assertEqual(stats["latency"]["count"], 2)
+
+
+class TestRenderServer(unittest.TestCase):
+    def setUp(self):
+        self.httpd = make_render_server(RenderService(TEMPLATE), port=0)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+
+    def tearDown(self):
+        self.connection.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def request(self, method, path, body=None):
+        self.connection.request(method, path, body)
+        response = self.connection.getresponse()
+        return response, response.read().decode()
+
+    def test_render(self):
+        response, html = self.request("POST", "/render?template=page", MARKDOWN.encode())
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("X-Render-Cache"), "miss")
+        self.assertIn("<h1>Title</h1>", html)
+        response, _ = self.request("POST", "/render?template=page", MARKDOWN.encode())
+        self.assertEqual(response.getheader("X-Render-Cache"), "hit")
+
+    def test_render_error(self):
+        response, text = self.request("POST", "/render?template=page", b"no title")
+        self.assertEqual(response.status, 422)
+
+    def test_invalid_content_length(self):
+        for length in (None, "abc", "-1", "1.5"):
+            connection = HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=5)
+            connection.putrequest("POST", "/render")
+            if length is not None:
+                connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            self.assertEqual(response.status, 400, length)
+
+    def test_stats(self):
+        self.request("POST", "/render", MARKDOWN.encode())
+        response, body = self.request("GET", "/stats")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body)["cache"]["misses"], 1)
+
+    def test_not_found(self):
+        response, _ = self.request("GET", "/other")
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
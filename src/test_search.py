@@ -0,0 +1,101 @@
+import json, os, tempfile
+import unittest
+
+from urls import BasepathResolver
+from search import SearchIndex, page_postings, page_search_url, shard_name, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertListEqual(tokenize("Tom's *Jacket* is BLUE, 42!"), ["tom", "s", "jacket", "is", "blue", "42"])
+
+    def test_page_postings(self):
+        self.assertDictEqual(
+            page_postings(["Old Tom", "tom is old"]),
+            {"old": [0, 4], "tom": [1, 2], "is": [3]}
+        )
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("tolkien"), "to")
+        self.assertEqual(shard_name("a"), "a")
+        self.assertEqual(shard_name("éowyn"), "uc3a96f")
+
+    def test_page_search_url(self):
+        self.assertEqual(page_search_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+        self.assertEqual(page_search_url(os.path.join("docs", "about.html"), "docs"), "/about.html")
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.source = os.path.join(self.tmp.name, "tom.md")
+        with open(self.source, "w") as f:
+            f.write("# Tom")
+        self.index = SearchIndex(os.path.join(self.tmp.name, "search.json"), self.docs)
+        self.index.record_page(self.source, os.path.join(self.docs, "tom", "index.html"), "Tom", ["Old Tom", "tom"])
+        self.index.record_page("missing.md", os.path.join(self.docs, "index.html"), "Home", ["Tolkien"])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.docs, "search", *parts)) as f:
+            return json.load(f)
+
+    def test_write(self):
+        self.index.write()
+        index = self.read("index.json")
+        self.assertDictEqual(index["pages"], {"0": {"url": "/tom/", "title": "Tom"}, "1": {"url": "/", "title": "Home"}})
+        self.assertListEqual(index["shards"], ["ol", "to"])
+        self.assertDictEqual(self.read("terms", "to.json"), {"tolkien": [[1, [0]]], "tom": [[0, [1, 2]]]})
+
+    def test_write_resolves_urls(self):
+        self.index.resolve_url = BasepathResolver("/staticsitegen/")
+        self.index.write()
+        self.assertEqual(self.read("index.json")["pages"]["0"]["url"], "/staticsitegen/tom/")
+        self.assertEqual(self.index.pages[self.source]["url"], "/tom/")
+
+    def test_write_only_changed_shards(self):
+        self.index.write()
+        self.index.record_page(self.source, os.path.join(self.docs, "tom", "index.html"), "Tom", ["Old Tom", "bombadil"])
+        written = self.index.write()
+        search = os.path.join(self.docs, "search")
+        # index.json lists the new "bo" shard; "ol" is unchanged
+        self.assertListEqual(sorted(written), [
+            os.path.join(search, "index.json"), os.path.join(search, "terms", "bo.json"), os.path.join(search, "terms", "to.json")
+        ])
+        self.assertDictEqual(self.read("terms", "bo.json"), {"bombadil": [[0, [2]]]})
+
+    def test_prune(self):
+        self.index.write()
+        self.index.prune({self.source})
+        self.index.write()
+        self.assertListEqual(list(self.read("index.json")["pages"]), ["0"])
+        self.assertDictEqual(self.read("terms", "to.json"), {"tom": [[0, [1, 2]]]})
+
+    def test_is_current(self):
+        self.index.record_page("new.md", os.path.join(self.docs, "new.html"), "New", ["new"], "abc")
+        self.assertTrue(self.index.is_current("new.md", "abc"))
+        self.assertFalse(self.index.is_current("new.md", "def"))
+        self.assertFalse(self.index.is_current("other.md", "abc"))
+        # Recorded without a hash, so never known to be current
+        self.assertFalse(self.index.is_current("missing.md", None))
+
+    def test_save_load_keeps_ids(self):
+        self.index.save()
+        loaded = SearchIndex.load(self.index.path, self.docs)
+        self.assertDictEqual(loaded.pages, self.index.pages)
+        loaded.record_page("new.md", os.path.join(self.docs, "new.html"), "New", ["new"])
+        self.assertEqual(loaded.pages["new.md"]["id"], 2)
+
+    def test_merge(self):
+        worker = self.index.fork()
+        worker.record_page("new.md", os.path.join(self.docs, "new.html"), "New", ["new"])
+        self.index.merge(worker.pages)
+        self.assertEqual(self.index.pages["new.md"]["id"], 2)
+        self.assertEqual(self.index.pages["new.md"]["url"], "/new.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os, tempfile, time
+import unittest
+
+from manifest import BuildManifest
+from sync import is_unchanged, list_files, sync_static
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.destination = os.path.join(self.tmp.name, "docs")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def dest(self, *parts):
+        return os.path.join(self.destination, *parts)
+
+    def test_list_files(self):
+        self.assertListEqual(
+            list_files(self.source),
+            [os.path.join(self.source, "images", "a.png"), os.path.join(self.source, "index.css")]
+        )
+
+    def test_sync_copies_new_files(self):
+        copied, unchanged, removed = sync_static(self.source, self.destination)
+        self.assertEqual(sorted(copied), [self.dest("images", "a.png"), self.dest("index.css")])
+        self.assertEqual(unchanged, [])
+        self.assertTrue(is_unchanged(os.path.join(self.source, "index.css"), self.dest("index.css")))
+
+    def test_sync_skips_unchanged_files(self):
+        sync_static(self.source, self.destination)
+        copied, unchanged, removed = sync_static(self.source, self.destination)
+        self.assertEqual(copied, [])
+        self.assertEqual(len(unchanged), 2)
+
+    def test_sync_copies_changed_files(self):
+        sync_static(self.source, self.destination)
+        source_path = os.path.join(self.source, "index.css")
+        self.write(source_path, "body { color: red; }")
+        copied, unchanged, removed = sync_static(self.source, self.destination)
+        self.assertEqual(copied, [self.dest("index.css")])
+
+    def test_sync_copies_same_size_edit_within_a_second(self):
+        sync_static(self.source, self.destination)
+        source_path = os.path.join(self.source, "index.css")
+        copied_ns = os.stat(self.dest("index.css")).st_mtime_ns
+        self.write(source_path, "body {x}")
+        os.utime(source_path, ns=(copied_ns + 1000, copied_ns + 1000))
+        copied, unchanged, removed = sync_static(self.source, self.destination)
+        self.assertEqual(copied, [self.dest("index.css")])
+
+    def test_is_unchanged_truncated_destination(self):
+        sync_static(self.source, self.destination)
+        source_path = os.path.join(self.source, "index.css")
+        os.utime(source_path, ns=(1_700_000_000_250_000_000, 1_700_000_000_250_000_000))
+        # As copied to a filesystem with whole second timestamps
+        os.utime(self.dest("index.css"), ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+        self.assertTrue(is_unchanged(source_path, self.dest("index.css")))
+        os.utime(source_path, ns=(1_700_000_001_250_000_000, 1_700_000_001_250_000_000))
+        self.assertFalse(is_unchanged(source_path, self.dest("index.css")))
+
+    def test_sync_hash_ignores_mtime(self):
+        sync_static(self.source, self.destination)
+        later = time.time() + 10
+        os.utime(os.path.join(self.source, "index.css"), (later, later))
+        copied, unchanged, removed = sync_static(self.source, self.destination, use_hash=True)
+        self.assertEqual(copied, [])
+
+    def test_sync_keeps_generated_files(self):
+        self.write(self.dest("index.html"), "<p>page</p>")
+        sync_static(self.source, self.destination, BuildManifest())
+        self.assertTrue(os.path.exists(self.dest("index.html")))
+
+    def test_sync_removes_stale_files(self):
+        manifest = BuildManifest()
+        sync_static(self.source, self.destination, manifest)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        copied, unchanged, removed = sync_static(self.source, self.destination, manifest)
+        self.assertEqual(removed, [self.dest("images", "a.png")])
+        self.assertFalse(os.path.exists(self.dest("images")))
+        self.assertEqual(manifest.static, {self.dest("index.css")})
+
+    def test_sync_rename(self):
+        manifest = BuildManifest()
+        rename = lambda path: path.replace(".", ".v1.")
+        copied, _, _ = sync_static(self.source, self.destination, manifest, rename=rename)
+        self.assertEqual(copied, [self.dest("images", "a.v1.png"), self.dest("index.v1.css")])
+        rename = lambda path: path.replace(".", ".v2.")
+        copied, unchanged, removed = sync_static(self.source, self.destination, manifest, rename=rename)
+        self.assertEqual(removed, [self.dest("images", "a.v1.png"), self.dest("index.v1.css")])
+        self.assertEqual(sorted(os.listdir(self.destination)), ["images", "index.v2.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from template import Template, resolve_attribute_urls
+from urls import BasepathResolver
+
+
+class TestResolveAttributeUrls(unittest.TestCase):
+    def test_resolve_attribute_urls(self):
+        self.assertEqual(
+            resolve_attribute_urls('<a href="/blog">x</a><img src="/a.png">', BasepathResolver("/site/")),
+            '<a href="/site/blog">x</a><img src="/site/a.png">'
+        )
+
+    def test_resolve_attribute_urls_no_resolver(self):
+        html = '<a href="/blog">x</a>'
+        self.assertEqual(resolve_attribute_urls(html, None), html)
+
+    def test_resolve_attribute_urls_text_untouched(self):
+        html = '<p>src="/a.png"</p><img data-src="/a.png">'
+        self.assertEqual(resolve_attribute_urls(html, BasepathResolver("/site/")), html)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_template_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>body</p>"),
+            "<title>Hi</title><main><p>body</p></main>"
+        )
+
+    def test_template_parts(self):
+        template = Template("a{{ Title }}b{{ Content }}c")
+        self.assertEqual(template.parts, ["a", "Title", "b", "Content", "c"])
+        self.assertEqual(template.placeholders, ("Title", "Content"))
+
+    def test_template_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render(Title="x"), "x|x")
+
+    def test_template_basepath(self):
+        template = Template('<link href="/index.css">{{ Content }}', BasepathResolver("/site/"))
+        self.assertEqual(template.render(Content='<a href="/">'), '<link href="/site/index.css"><a href="/">')
+
+    def test_template_iter_render_chunks(self):
+        template = Template("<main>{{ Content }}</main>")
+        self.assertListEqual(
+            list(template.iter_render(Content=iter(["<p>", "body", "</p>"]))),
+            ["<main>", "<p>", "body", "</p>", "</main>"]
+        )
+
+    def test_template_unknown_placeholder(self):
+        with self.assertRaises(ValueError):
+            Template("{{ Title }}{{ Author }}")
+
+    def test_template_missing_value(self):
+        template = Template("{{ Title }}{{ Content }}")
+        with self.assertRaises(ValueError):
+            template.render(Title="x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from urls import AssetResolver, BasepathResolver
+
+
+class TestBasepathResolver(unittest.TestCase):
+    def test_root_url(self):
+        self.assertEqual(BasepathResolver("/site/")("/images/a.png"), "/site/images/a.png")
+
+    def test_root(self):
+        self.assertEqual(BasepathResolver("/site/")("/"), "/site/")
+
+    def test_default_basepath(self):
+        self.assertEqual(BasepathResolver()("/images/a.png"), "/images/a.png")
+
+    def test_other_urls_unchanged(self):
+        resolve_url = BasepathResolver("/site/")
+        for url in ("https://boot.dev", "//cdn.example.com/a.js", "images/a.png", "#top", ""):
+            self.assertEqual(resolve_url(url), url)
+
+
+class TestAssetResolver(unittest.TestCase):
+    def setUp(self):
+        self.assets = {"/index.css": "/index.0123abcd.css"}
+
+    def test_asset_url(self):
+        self.assertEqual(AssetResolver(self.assets)("/index.css"), "/index.0123abcd.css")
+
+    def test_query_and_fragment_kept(self):
+        resolve_url = AssetResolver(self.assets)
+        self.assertEqual(resolve_url("/index.css?v=1"), "/index.0123abcd.css?v=1")
+        self.assertEqual(resolve_url("/index.css#top"), "/index.0123abcd.css#top")
+
+    def test_chained_with_basepath(self):
+        resolve_url = AssetResolver(self.assets, BasepathResolver("/site/"))
+        self.assertEqual(resolve_url("/index.css"), "/site/index.0123abcd.css")
+        self.assertEqual(resolve_url("/blog"), "/site/blog")
+
+    def test_other_urls_unchanged(self):
+        resolve_url = AssetResolver(self.assets)
+        for url in ("https://boot.dev/index.css", "index.css", "/other.css", ""):
+            self.assertEqual(resolve_url(url), url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import contextlib, io, random
 import unittest
 
 from textnode import TextNode, TextType
@@ -5,11 +6,12 @@ from htmlnode import LeafNode, ParentNode
 from util import (text_node_to_html_node, split_nodes_delimiter,\
                  extract_markdown_images, extract_markdown_links,\
                  split_nodes_image, split_nodes_link, split_nodes_link_helper,\
-                 text_to_textnodes, markdown_to_blocks, block_to_block_type,\
+                 text_to_textnodes, markdown_to_blocks, iter_markdown_blocks, block_to_block_type, classify_block,\
                  text_to_children, block_to_heading_html_node, block_to_code_html_node,\
                  block_to_quote_html_node, block_to_unordered_list_html_node,\
                  block_to_ordered_list_html_node, block_to_paragraph_html_node,\
-                 markdown_to_html_node, extract_title)
+                 markdown_to_html_node, extract_title,\
+                 INLINE_DELIMITERS)
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text_node_to_html_node_text(self):
@@ -41,6 +43,14 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         )
 
 
+    def test_text_node_to_html_node_resolve_url(self):
+        text_node = TextNode("hello world", TextType.LINK, "/blog")
+        self.assertEqual(
+            text_node_to_html_node(text_node, lambda url: "/site" + url).to_html(),
+            "<a href=\"/site/blog\">hello world</a>"
+        )
+
+
 class TestSplitNodesDelimiter(unittest.TestCase):
 
     def test_split_nodes_delimiter_code_in_text(self):
@@ -391,6 +401,52 @@ class TestTextToTextNode(unittest.TestCase):
             ]
         )
     
+    def test_text_to_text_node_image_inside_link(self):
+        text = "[![logo](/logo.png)](/home)"
+        self.assertListEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("[", TextType.TEXT),
+                TextNode("logo", TextType.IMAGE, "/logo.png"),
+                TextNode("](/home)", TextType.TEXT),
+            ]
+        )
+
+    def test_text_to_text_node_delimiter_in_link(self):
+        text = "a [snake_case](https://x.y/a_b) *word*"
+        self.assertListEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("snake_case", TextType.LINK, "https://x.y/a_b"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("word", TextType.ITALIC),
+            ]
+        )
+
+    def test_text_to_text_node_missing_closing_delimiter(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            nodes = text_to_textnodes("**bold** and `code [link](/x)")
+        self.assertListEqual(nodes, [TextNode("bold", TextType.BOLD), TextNode("link", TextType.LINK, "/x")])
+        self.assertIn("missing a closing delimiter (`)", out.getvalue())
+
+    def test_text_to_text_node_matches_split_nodes_chain(self):
+        def split_nodes_chain(text):
+            nodes = split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)]))
+            for delimiter, text_type in INLINE_DELIMITERS:
+                nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+            return nodes
+
+        pieces = ["![", "[", "]", "(", ")", "](", "*", "**", "_", "`", "a", " ", "\n", "!", "![a](b)", "[c](d)"]
+        rng = random.Random(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(2000):
+                text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 16)))
+                expected = split_nodes_chain(text)
+                actual = text_to_textnodes(text)
+                self.assertListEqual(actual, expected, text)
+                self.assertListEqual([node.url for node in actual], [node.url for node in expected], text)
+    
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -461,6 +517,26 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
         )
 
 
+class TestIterMarkdownBlocks(unittest.TestCase):
+    def test_iter_markdown_blocks(self):
+        lines = io.StringIO("# Heading\n\nParagraph\nline two\n\n\n\n* item\n")
+        self.assertListEqual(
+            list(iter_markdown_blocks(lines)),
+            ["# Heading", "Paragraph\nline two", "* item"]
+        )
+
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        rng = random.Random(15)
+        pieces = ["# a", "text", "  ", "\n", "\n\n", " \n", "```", "* b"]
+        for _ in range(2000):
+            markdown = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertListEqual(
+                list(iter_markdown_blocks(io.StringIO(markdown))),
+                markdown_to_blocks(markdown),
+                repr(markdown)
+            )
+
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type_paragraph(self):
         block = "asdf\nasdf\nasdf"
@@ -486,10 +562,43 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "```\n>asdf\n> asdf\n>asdf\n```"
         self.assertEqual(block_to_block_type(block), "code")
 
+    def test_block_to_block_type_code_language(self):
+        self.assertEqual(block_to_block_type("```python\nprint(1)\n```"), "code")
+        self.assertEqual(block_to_block_type("```not a tag\nprint(1)\n```"), "paragraph")
+
     def test_block_to_block_type_heading(self):
         block = "### Heading"
         self.assertEqual(block_to_block_type(block), "heading")
 
+    def test_block_to_block_type_heading_multiline(self):
+        block = "# Heading\nmore text"
+        self.assertEqual(block_to_block_type(block), "paragraph")
+
+    def test_block_to_block_type_mixed_bullets(self):
+        block = "* asdf\n- asdf"
+        self.assertEqual(block_to_block_type(block), "paragraph")
+
+    def test_block_to_block_type_ordered_list_wrong_number(self):
+        block = "1. asdf\n3. asdf"
+        self.assertEqual(block_to_block_type(block), "paragraph")
+
+
+class TestClassifyBlock(unittest.TestCase):
+    def test_classify_block_lines(self):
+        self.assertEqual(
+            classify_block("1. asdf\n2. qwer"),
+            ("ordered_list", ["1. asdf", "2. qwer"])
+        )
+
+    def test_classify_block_lines_reused(self):
+        block = "> a\n> b"
+        block_type, lines = classify_block(block)
+        self.assertEqual(block_type, "quote")
+        self.assertEqual(
+            str(block_to_quote_html_node(block, lines)),
+            str(block_to_quote_html_node(block))
+        )
+
 
 class TestTextToChildren(unittest.TestCase):
     def test_text_to_children(self):
@@ -560,6 +669,17 @@ class TestBlockToCodeHTMLNode(unittest.TestCase):
         for child in children:
             self.assertIsInstance(child, LeafNode)
 
+    def test_block_to_code_html_node_language(self):
+        block = "```python\nreturn x < 1\n```"
+        self.assertEqual(
+            block_to_code_html_node(block).to_html(),
+            '<pre><code class="language-python"><span class="hl-keyword">return</span> x &lt; <span class="hl-number">1</span></code></pre>'
+        )
+
+    def test_block_to_code_html_node_unknown_language(self):
+        block = "```brainfuck\n+[-]\n```"
+        self.assertEqual(block_to_code_html_node(block).to_html(), '<pre><code class="language-brainfuck">+[-]</code></pre>')
+
 
 class TestBlockToQuoteHTMLNode(unittest.TestCase):
     def test_block_to_quote_html_node(self):
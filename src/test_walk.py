@@ -0,0 +1,69 @@
+import os, sys, tempfile
+import unittest
+
+from walk import matches, walk_files
+
+
+class TestWalkFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for path in ("index.md", "a.txt", "blog/tom/index.md", "blog/tom/tom.png", "blog/index.md", "drafts/new.md", "zz.md"):
+            self.write(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path):
+        path = os.path.join(self.tmp.name, *path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("x")
+
+    def walk(self, **kwargs):
+        return [relative_path for relative_path, _ in walk_files(self.tmp.name, **kwargs)]
+
+    def test_walk_files_sorted_depth_first(self):
+        self.assertListEqual(
+            self.walk(),
+            ["a.txt", "blog/index.md", "blog/tom/index.md", "blog/tom/tom.png", "drafts/new.md", "index.md", "zz.md"]
+        )
+
+    def test_walk_files_entries(self):
+        relative_path, entry = next(walk_files(self.tmp.name))
+        self.assertEqual(entry.path, os.path.join(self.tmp.name, "a.txt"))
+        self.assertTrue(entry.is_file())
+
+    def test_walk_files_include(self):
+        self.assertListEqual(self.walk(include=("*.md",)), ["blog/index.md", "blog/tom/index.md", "drafts/new.md", "index.md", "zz.md"])
+
+    def test_walk_files_exclude(self):
+        self.assertListEqual(self.walk(include=("*.md",), exclude=("drafts", "blog/tom/*")), ["blog/index.md", "index.md", "zz.md"])
+
+    def test_walk_files_missing_root(self):
+        self.assertListEqual(list(walk_files(os.path.join(self.tmp.name, "missing"))), [])
+
+    def test_walk_files_is_lazy(self):
+        walk = walk_files(self.tmp.name)
+        self.assertEqual(next(walk)[0], "a.txt")
+        self.write("b.txt")
+        self.assertEqual(next(walk)[0], "blog/index.md")
+
+    def test_walk_files_deep_tree(self):
+        # Deeper than the recursion limit allows a recursive walk to go
+        path = "/".join(["d"] * 300) + "/deep.md"
+        self.write(path)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            self.assertListEqual(self.walk(include=("deep.md",)), [path])
+        finally:
+            sys.setrecursionlimit(limit)
+
+    def test_matches(self):
+        self.assertTrue(matches("blog/tom/index.md", "index.md", ("*.md",)))
+        self.assertTrue(matches("blog/tom/index.md", "index.md", ("blog/*",)))
+        self.assertFalse(matches("blog/tom/index.md", "index.md", ("tom/*", "*.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
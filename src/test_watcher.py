@@ -0,0 +1,45 @@
+import os, tempfile
+import unittest
+
+from watcher import PollingWatcher, snapshot
+
+
+class TestPollingWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.page = os.path.join(self.content, "blog", "index.md")
+        self.write(self.page, "# Title")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_snapshot(self):
+        missing = os.path.join(self.tmp.name, "missing.html")
+        self.assertEqual(list(snapshot([self.content, missing])), [self.page])
+
+    def test_poll_no_changes(self):
+        watcher = PollingWatcher([self.content])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_poll_modified(self):
+        watcher = PollingWatcher([self.content])
+        self.write(self.page, "# A longer title")
+        self.assertEqual(watcher.poll(), [self.page])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_poll_added_and_removed(self):
+        watcher = PollingWatcher([self.content])
+        added = os.path.join(self.content, "new.md")
+        self.write(added, "# New")
+        os.remove(self.page)
+        self.assertEqual(watcher.poll(), sorted([added, self.page]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os, tempfile, threading
+import unittest
+
+from manifest import hash_bytes
+from outputs import OutputState
+from profiler import BuildProfile
+from writer import OutputWriter, commit_temp, write_chunks, write_file, write_temp
+
+
+class TestWriteFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_write_file(self):
+        self.assertTrue(write_file(self.path, b"<p>hi</p>"))
+        self.assertEqual(self.read(), b"<p>hi</p>")
+        self.assertListEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_write_file_skips_identical(self):
+        write_file(self.path, b"<p>hi</p>")
+        os.utime(self.path, (0, 0))
+        self.assertFalse(write_file(self.path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime, 0)
+        self.assertTrue(write_file(self.path, b"<p>ho</p>"))
+        self.assertEqual(self.read(), b"<p>ho</p>")
+
+    def test_write_chunks(self):
+        self.assertTrue(write_chunks(self.path, ["<p>", "hi", "</p>"]))
+        self.assertFalse(write_chunks(self.path, iter(["<p>hi", "</p>"])))
+        self.assertEqual(self.read(), b"<p>hi</p>")
+        self.assertListEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_write_chunks_state(self):
+        state = OutputState()
+        self.assertTrue(write_chunks(self.path, ["<p>", "hi</p>"], state=state))
+        self.assertTrue(state.is_identical(self.path, hash_bytes(b"<p>hi</p>")))
+        self.assertFalse(write_chunks(self.path, ["<p>hi</p>"], state=state))
+        self.assertTrue(write_chunks(self.path, ["<p>ho</p>"], state=state))
+        self.assertEqual(self.read(), b"<p>ho</p>")
+
+    def test_write_chunks_failure_keeps_old_file(self):
+        write_file(self.path, b"old")
+        def chunks():
+            yield "new"
+            raise ValueError("render failed")
+        with self.assertRaises(ValueError):
+            write_chunks(self.path, chunks())
+        self.assertEqual(self.read(), b"old")
+        self.assertListEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_write_temp_and_commit_temp(self):
+        temp_path, digest, size = write_temp(self.path, ["<p>", b"hi", "</p>"])
+        self.assertEqual(size, 9)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(commit_temp(self.path, temp_path, digest))
+        self.assertEqual(self.read(), b"<p>hi</p>")
+        temp_path, digest, _ = write_temp(self.path, ["<p>hi</p>"])
+        self.assertFalse(commit_temp(self.path, temp_path, digest))
+        self.assertListEqual(os.listdir(self.tmp.name), ["index.html"])
+
+
+class TestOutputWriter(unittest.TestCase):
+    def test_output_writer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, "blog", str(i), "index.html") for i in range(20)]
+            with OutputWriter(max_workers=4) as writer:
+                writer.make_dirs(paths)
+                futures = [writer.write(path, ["<p>", str(i), "</p>"]) for i, path in enumerate(paths)]
+            self.assertTrue(all(future.result() for future in futures))
+            for i, path in enumerate(paths):
+                with open(path) as f:
+                    self.assertEqual(f.read(), f"<p>{i}</p>")
+            with OutputWriter() as writer:
+                self.assertFalse(writer.write(paths[0], "<p>0</p>").result())
+
+    def test_output_writer_streams_in_caller(self):
+        # Chunks are consumed by the calling thread, not joined and queued
+        threads = set()
+
+        def chunks():
+            for chunk in ("<p>", "hi", "</p>"):
+                threads.add(threading.get_ident())
+                yield chunk
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter() as writer:
+                temp_path, digest, size = writer.stage(os.path.join(tmp, "index.html"), chunks())
+                self.assertTrue(os.path.isfile(temp_path))
+                future = writer.commit(os.path.join(tmp, "index.html"), temp_path, digest)
+            self.assertTrue(future.result())
+            self.assertEqual(size, 9)
+            self.assertListEqual(os.listdir(tmp), ["index.html"])
+        self.assertEqual(threads, {threading.get_ident()})
+
+    def test_output_writer_max_pending(self):
+        # With max_pending commits in flight, write() waits for one to finish
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter(max_pending=1) as writer:
+                writer.pending.acquire()
+                thread = threading.Thread(target=writer.write, args=(os.path.join(tmp, "index.html"), b"<p>hi</p>"))
+                thread.start()
+                thread.join(0.1)
+                self.assertTrue(thread.is_alive())
+                writer.pending.release()
+                thread.join()
+            self.assertTrue(os.path.isfile(os.path.join(tmp, "index.html")))
+
+    def test_output_writer_profile(self):
+        profile = BuildProfile()
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter(profile=profile) as writer:
+                for i in range(3):
+                    writer.write(os.path.join(tmp, f"{i}.html"), b"<p>hi</p>")
+        self.assertEqual(profile.phases["write"]["count"], 3)
+
+    def test_output_writer_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter() as writer:
+                os.mkdir(os.path.join(tmp, "index.html"))
+                future = writer.write(os.path.join(tmp, "index.html"), b"<p>hi</p>")
+            self.assertIsInstance(future.exception(), OSError)
+
+
+if __name__ == "__main__":
+    unittest.main()
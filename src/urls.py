@@ -0,0 +1,41 @@
+URL_ATTRIBUTES = ("href", "src")
+
+class BasepathResolver:
+    # Default URL resolver: site-root URLs ("/images/a.png") are moved under
+    # basepath. Relative, absolute and protocol-relative ("//host/...") URLs
+    # are returned unchanged.
+
+    def __init__(self, basepath="/"):
+        self.basepath = basepath
+
+    def __call__(self, url):
+        if self.basepath == "/" or not url.startswith("/") or url.startswith("//"):
+            return url
+        return self.basepath + url[1:]
+
+    def __repr__(self):
+        return f"BasepathResolver({self.basepath})"
+
+class AssetResolver:
+    # Replaces site-root URLs of fingerprinted static files with their hashed
+    # names ("/index.css" -> "/index.0123abcd.css"), keeping any query or
+    # fragment, then passes the URL on to resolve_url (usually a
+    # BasepathResolver).
+
+    def __init__(self, assets, resolve_url=None):
+        self.assets = assets
+        self.resolve_url = resolve_url
+
+    def __call__(self, url):
+        end = len(url)
+        for separator in "?#":
+            index = url.find(separator)
+            if index != -1:
+                end = min(end, index)
+        hashed = self.assets.get(url[:end])
+        if hashed is not None:
+            url = hashed + url[end:]
+        return url if self.resolve_url is None else self.resolve_url(url)
+
+    def __repr__(self):
+        return f"AssetResolver({len(self.assets)} assets, {self.resolve_url!r})"
@@ -4,8 +4,15 @@ from typing import List
 
 from textnode import TextNode, TextType
 from htmlnode import LeafNode, ParentNode
+from highlight import highlight
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+# Bump whenever the parser's output for the same markdown changes; cached
+# parse results and build manifest entries from older versions are ignored
+PARSER_VERSION = 2
+
+def text_node_to_html_node(text_node: TextNode, resolve_url=None) -> LeafNode:
+    # With resolve_url the link/image URL is resolved now; otherwise it can
+    # be resolved when rendering, see HTMLNode.to_html
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -16,9 +23,11 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+            return LeafNode("a", text_node.text, {"href": url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            url = text_node.url if resolve_url is None else resolve_url(text_node.url)
+            return LeafNode("img", "", {"src": url, "alt": text_node.text})
         case _:
             raise ValueError("TextNode does not have a valid text type.")
 
@@ -93,110 +102,211 @@ def split_nodes_link_helper(old_nodes, text_type: TextType = TextType.LINK):
             new_nodes.append(TextNode(split_text[-1], TextType.TEXT))
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[(.*?)\]\((.*?)\)")
+INLINE_TOKEN_PATTERN = re.compile(r"\[(.*?)\]\((.*?)\)|\*\*|[*_`]")
+INLINE_DELIMITERS = (
+    ("**", TextType.BOLD),
+    ("*", TextType.ITALIC),
+    ("_", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
+
 def text_to_textnodes(text):
-    old_node = TextNode(text, TextType.TEXT)
-    new_nodes = split_nodes_link(split_nodes_image([old_node]))
-    
-    delimiters = [
-        ("**", TextType.BOLD),
-        ("*", TextType.ITALIC),
-        ("_", TextType.ITALIC),
-        ("`", TextType.CODE)
-    ]
-
-    for delimiter_str, text_type in delimiters:
-        new_nodes = split_nodes_delimiter(new_nodes, delimiter_str, text_type)
-    
-    return new_nodes
+    # Single left-to-right scan that produces the same nodes as running
+    # split_nodes_image, split_nodes_link and then split_nodes_delimiter for
+    # each of INLINE_DELIMITERS. Images are matched across the whole text
+    # first (as split_nodes_image does), links and delimiters are matched in
+    # the gaps between them.
+    nodes = []
+    pos = 0
+    for image in IMAGE_PATTERN.finditer(text):
+        scan_inline_links_and_delimiters(text, pos, image.start(), nodes)
+        nodes.append(TextNode(image.group(1), TextType.IMAGE, image.group(2)))
+        pos = image.end()
+    scan_inline_links_and_delimiters(text, pos, len(text), nodes)
+    return nodes
+
+def scan_inline_links_and_delimiters(text, start, end, nodes):
+    # tokens holds the plain text runs and delimiter strings between links;
+    # text runs never contain delimiter characters, so they can't be confused
+    tokens = []
+    pos = start
+    while True:
+        match = INLINE_TOKEN_PATTERN.search(text, pos, end)
+        if match is None:
+            break
+        if match.start() > pos:
+            tokens.append(text[pos:match.start()])
+        if match.group(2) is None:
+            tokens.append(match.group())
+        else:
+            emit_delimited_tokens(tokens, 0, nodes)
+            tokens = []
+            nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        pos = match.end()
+    if end > pos:
+        tokens.append(text[pos:end])
+    emit_delimited_tokens(tokens, 0, nodes)
+
+def emit_delimited_tokens(tokens, level, nodes):
+    if level == len(INLINE_DELIMITERS):
+        text = "".join(tokens)
+        if text != "":
+            nodes.append(TextNode(text, TextType.TEXT))
+        return
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    count = tokens.count(delimiter)
+    if count % 2 != 0:
+        # Same behaviour as split_nodes_delimiter: warn and drop the text
+        print(Exception(f"Invalid markdown: missing a closing delimiter ({delimiter})."))
+        return
+    if count == 0:
+        emit_delimited_tokens(tokens, level + 1, nodes)
+        return
+
+    is_text = True
+    piece_start = 0
+    for i in range(len(tokens) + 1):
+        if i < len(tokens) and tokens[i] != delimiter:
+            continue
+        piece = tokens[piece_start:i]
+        if is_text:
+            emit_delimited_tokens(piece, level + 1, nodes)
+        else:
+            text = "".join(piece)
+            if text != "":
+                nodes.append(TextNode(text, text_type))
+        is_text = not is_text
+        piece_start = i + 1
 
 def markdown_to_blocks(markdown: str):
     return list(filter(lambda x: x != "", map(lambda x: x.strip(), markdown.split("\n\n"))))
+
+def iter_markdown_blocks(lines):
+    # Streaming markdown_to_blocks: takes an iterable of lines (e.g. an open
+    # file) and yields the same blocks, holding only one block in memory.
+    # Blocks are separated by empty lines, which is where "\n\n" splits.
+    block_lines = []
+    for line in lines:
+        if line != "\n":
+            block_lines.append(line)
+            continue
+        block = "".join(block_lines).strip()
+        block_lines = []
+        if block != "":
+            yield block
+    block = "".join(block_lines).strip()
+    if block != "":
+        yield block
     
+HEADING_PATTERN = re.compile(r"^(#{1,6}) (.+)$")
+# Opening fence with an optional language tag ("```python")
+CODE_FENCE_PATTERN = re.compile(r"```([\w+#.-]*)\n")
+
+def classify_block(block: str):
+    # Classify a block from a single split of its lines; the lines are
+    # returned as well so the block_to_*_html_node builders can reuse them.
+    # Every all(...) check stops at the first line that doesn't match.
+    lines = block.splitlines()
+    first = block[:1]
+    if first == "#" and HEADING_PATTERN.match(block):
+        return "heading", lines
+    if first == "`" and CODE_FENCE_PATTERN.match(block) and block.endswith("\n```"):
+        return "code", lines
+    if all(line.startswith(">") for line in lines):
+        return "quote", lines
+    if first == "*" or first == "-":
+        bullet = first + " "
+        if all(line.startswith(bullet) for line in lines):
+            return "unordered_list", lines
+    if first == "1" and all(line.startswith(f"{num}. ") for num, line in enumerate(lines, 1)):
+        return "ordered_list", lines
+    return "paragraph", lines
+
 def block_to_block_type(block: str):
-    unordered_list_bullet = "\*" if  (block and block[0] in "*-" and block[0] == "*") else "-"
-
-    is_unordered_list = False
-    if block and block[0] in "*-":
-        is_unordered_list = len(re.findall(f"^{unordered_list_bullet} ", block, re.MULTILINE)) == len(block.splitlines())
-    if re.match("^#{1,6} .+$", block):
-        return "heading"
-    elif block.startswith("```\n") and block.endswith("\n```"):
-        return "code"
-    elif len(re.findall("^>|\n>", block)) == len(block.splitlines()):
-        return "quote"
-    elif block and block[0] in "*-" and is_unordered_list:
-        return "unordered_list"
-    elif re.findall("^(\d+)\. ", block, re.MULTILINE) == list(map(str, range(1, len(block.splitlines()) + 1))):
-        return "ordered_list"
-    else:
-        return "paragraph"
+    return classify_block(block)[0]
 
-def text_to_children(text: str):
+def text_to_children(text: str, on_text_nodes=None):
     text_nodes = text_to_textnodes(text)
+    if on_text_nodes is not None:
+        on_text_nodes(text_nodes)
     return [text_node_to_html_node(text_node) for text_node in text_nodes]
 
-def block_to_heading_html_node(markdown: str):
-    res = re.match("^(#{1,6}) (.+)$", markdown)
+def block_to_heading_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
+    res = HEADING_PATTERN.match(markdown)
     heading_markers = res.group(1)
     if heading_markers:
         inline_heading = res.group(2)
-        return ParentNode(f"h{len(res.group(1))}", text_to_children(inline_heading))
+        return ParentNode(f"h{len(res.group(1))}", text_to_children(inline_heading, on_text_nodes))
     else:
         raise ValueError("Not a valid markdown heading.")
 
-def block_to_code_html_node(markdown: str):
-    # code block cannot be delimited inline so it is a leaf node
-    child = text_node_to_html_node(TextNode(markdown[3:-3].strip(), TextType.CODE))
-    return ParentNode("pre", [child])
+def block_to_code_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
+    # code block cannot be delimited inline so it is a leaf node. A fence
+    # with a language tag gets a language-* class, and is highlighted when
+    # there is a lexer for the language (see highlight.py)
+    language = CODE_FENCE_PATTERN.match(markdown).group(1)
+    code = markdown[len(language) + 3:-3].strip()
+    if not language:
+        return ParentNode("pre", [text_node_to_html_node(TextNode(code, TextType.CODE))])
+    highlighted = highlight(code, language, highlight_cache)
+    return ParentNode("pre", [LeafNode("code", code if highlighted is None else highlighted, {"class": f"language-{language}"})])
 
-def block_to_quote_html_node(markdown: str):
+def block_to_quote_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
     # Assuming no nested blockquotes
+    if lines is None:
+        lines = markdown.splitlines()
     text = " ".join([
         line.strip(">").strip() \
-            for line in markdown.splitlines()
+            for line in lines
         ])
-    return ParentNode("blockquote", text_to_children(text))
+    return ParentNode("blockquote", text_to_children(text, on_text_nodes))
 
-def block_to_unordered_list_html_node(markdown: str):
+def block_to_unordered_list_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
     # Assuming no nested lists
-    lines = markdown.splitlines()
+    if lines is None:
+        lines = markdown.splitlines()
     bullet = markdown[0]
     items = [line.strip().removeprefix(bullet + " ") for line in lines]
     
-    item_html_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    item_html_nodes = [ParentNode("li", text_to_children(item, on_text_nodes)) for item in items]
     return ParentNode("ul", item_html_nodes)
 
-def block_to_ordered_list_html_node(markdown: str):
-    lines = markdown.splitlines()
+def block_to_ordered_list_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
+    if lines is None:
+        lines = markdown.splitlines()
     items = [line.strip().removeprefix(str(num) + ". ") for num, line in enumerate(lines, 1)]
     
-    item_html_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    item_html_nodes = [ParentNode("li", text_to_children(item, on_text_nodes)) for item in items]
     return ParentNode("ol", item_html_nodes)
 
-def block_to_paragraph_html_node(markdown: str):
-    return ParentNode("p", text_to_children(markdown))
+def block_to_paragraph_html_node(markdown: str, lines=None, on_text_nodes=None, highlight_cache=None):
+    return ParentNode("p", text_to_children(markdown, on_text_nodes))
 
-def markdown_to_html_node(markdown: str):
-    markdown_blocks = markdown_to_blocks(markdown)
-    block_to_html_node_funcs = {
-        "heading": block_to_heading_html_node,
-        "code": block_to_code_html_node,
-        "quote": block_to_quote_html_node,
-        "unordered_list": block_to_unordered_list_html_node,
-        "ordered_list": block_to_ordered_list_html_node,
-        "paragraph": block_to_paragraph_html_node,
-    }
+BLOCK_TO_HTML_NODE_FUNCS = {
+    "heading": block_to_heading_html_node,
+    "code": block_to_code_html_node,
+    "quote": block_to_quote_html_node,
+    "unordered_list": block_to_unordered_list_html_node,
+    "ordered_list": block_to_ordered_list_html_node,
+    "paragraph": block_to_paragraph_html_node,
+}
 
+def markdown_to_html_node(markdown: str, highlight_cache=None):
+    return blocks_to_html_node(markdown_to_blocks(markdown), highlight_cache=highlight_cache)
+
+def blocks_to_html_node(markdown_blocks, on_text_nodes=None, highlight_cache=None):
     leaf_nodes = []
     for markdown_block in markdown_blocks:
-        block_type = block_to_block_type(markdown_block)
-        leaf_nodes.append(block_to_html_node_funcs[block_type](markdown_block))
+        block_type, lines = classify_block(markdown_block)
+        leaf_nodes.append(BLOCK_TO_HTML_NODE_FUNCS[block_type](markdown_block, lines, on_text_nodes, highlight_cache))
     return ParentNode("div", leaf_nodes)
 
 def extract_title(markdown):
     blocks = markdown_to_blocks(markdown)
     for block in blocks:
-        if block_to_block_type(block) == "heading" and block.startswith("# "):
+        # Only a single line "# " heading can be the title, so there is no
+        # need to classify the block fully
+        if block.startswith("# ") and HEADING_PATTERN.match(block):
             return block[2:].strip()
     raise Exception("A title cannot be found")
-
@@ -0,0 +1,34 @@
+import os
+from fnmatch import fnmatchcase
+
+def matches(relative_path, name, patterns):
+    # A glob matches either the path relative to the walk's root ("drafts/*")
+    # or the bare name ("*.md"); "*" also matches "/"
+    return any(fnmatchcase(relative_path, pattern) or fnmatchcase(name, pattern) for pattern in patterns)
+
+def walk_files(root, include=None, exclude=None):
+    # Yield (relative path, os.DirEntry) for every file under root, in the
+    # same sorted depth-first order as a recursive sorted os.listdir walk.
+    # Iterative, so deep trees don't hit the recursion limit, and lazy, so
+    # callers can start on the first files before the walk is done. The
+    # DirEntry's cached type is used instead of a stat per entry. Excluded
+    # directories are not descended into; include only applies to files.
+    # Relative paths use "/" as the separator.
+    exclude = exclude or ()
+    # (relative path, DirEntry or None for root); popped in sorted order
+    pending = [("", None)]
+    while pending:
+        relative_path, entry = pending.pop()
+        if entry is not None and not entry.is_dir():
+            if include is None or matches(relative_path, entry.name, include):
+                yield relative_path, entry
+            continue
+        try:
+            with os.scandir(root if entry is None else entry.path) as scanner:
+                entries = sorted(scanner, key=lambda child: child.name, reverse=True)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for child in entries:
+            child_path = f"{relative_path}/{child.name}" if relative_path else child.name
+            if not matches(child_path, child.name, exclude):
+                pending.append((child_path, child))
@@ -0,0 +1,37 @@
+import os
+
+from walk import walk_files
+
+def snapshot(paths):
+    # Map every file under paths to its (mtime, size); plain files in paths
+    # are included directly. Missing paths are simply absent.
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for _, entry in walk_files(path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+class PollingWatcher:
+    # Stat-based change detection, so no OS specific notification API is
+    # needed. Call poll() periodically to get the paths that changed.
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.state = snapshot(self.paths)
+
+    def poll(self):
+        state = snapshot(self.paths)
+        changed = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+        self.state = state
+        return sorted(changed)
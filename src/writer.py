@@ -0,0 +1,167 @@
+import contextlib, filecmp, hashlib, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_bytes
+from profiler import NULL_PROFILE
+
+# Staged files waiting to be committed; commit() blocks beyond this, so that
+# rendering faster than the volume can keep up doesn't pile up temporary files
+DEFAULT_MAX_PENDING = 16
+
+def temp_path_for(path):
+    # Next to the destination so that os.replace stays on one filesystem
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def is_identical(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as existing_file:
+            return existing_file.read() == data
+    except FileNotFoundError:
+        return False
+
+def write_file(path, data, state=None):
+    # Atomically replace path with data unless it already holds exactly
+    # those bytes. Readers see either the old or the new file, never a
+    # partial one. Returns whether anything was written. With an
+    # outputs.OutputState, the comparison uses the stored hash instead of
+    # reading the file back.
+    digest = None
+    if state is not None:
+        digest = hash_bytes(data)
+        identical = state.is_identical(path, digest)
+        if identical is None:
+            identical = is_identical(path, data)
+        if identical:
+            return False
+    elif is_identical(path, data):
+        return False
+    temp_path = temp_path_for(path)
+    try:
+        with open(temp_path, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+    if state is not None:
+        state.record(path, digest)
+    return True
+
+def write_temp(path, chunks, encoding="utf-8"):
+    # First half of write_chunks: stream chunks (str or bytes) into a
+    # temporary file next to path, hashing them on the way. Returns
+    # (temp path, sha256 hex digest, size in bytes) for commit_temp.
+    temp_path = temp_path_for(path)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, "wb") as temp_file:
+            for chunk in chunks:
+                data = chunk if isinstance(chunk, bytes) else chunk.encode(encoding)
+                hasher.update(data)
+                temp_file.write(data)
+                size += len(data)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+    return temp_path, hasher.hexdigest(), size
+
+def commit_temp(path, temp_path, digest, state=None):
+    # Second half of write_chunks: replace path with the temporary file
+    # unless they are identical, in which case it is removed. With an
+    # outputs.OutputState the comparison uses digest instead of reading path
+    # back. Returns whether anything was written.
+    try:
+        identical = None if state is None else state.is_identical(path, digest)
+        if identical is None:
+            identical = os.path.isfile(path) and filecmp.cmp(temp_path, path, shallow=False)
+        if identical:
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+    if state is not None:
+        state.record(path, digest)
+    return True
+
+def write_chunks(path, chunks, encoding="utf-8", state=None):
+    # write_file for content too large to hold in memory: the chunks are
+    # streamed to the temporary file, which is compared with path afterwards
+    temp_path, digest, _ = write_temp(path, chunks, encoding)
+    return commit_temp(path, temp_path, digest, state)
+
+class OutputWriter:
+    # Writes output files in two steps: stage() streams the content into a
+    # temporary file in the calling thread, so that no page is held in
+    # memory whole, and commit() hands comparing it with the existing file
+    # and renaming it over to a thread pool, overlapping that I/O with
+    # rendering the next page. commit() and write() return a Future that
+    # resolves to whether the file was written or skipped as identical.
+    # Directories are created once per build rather than once per file.
+    # At most max_pending staged files wait for their commit. The time each
+    # commit takes in its thread is added to profile's "write" phase.
+
+    def __init__(self, max_workers=None, encoding="utf-8", state=None, max_pending=DEFAULT_MAX_PENDING, profile=NULL_PROFILE):
+        self.encoding = encoding
+        self.state = state
+        self.profile = profile
+        self.profile_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="writer")
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.directories = set()
+
+    def make_dirs(self, paths):
+        # Create the parent directories of all paths, each one only once
+        directories = {os.path.dirname(path) for path in paths} - self.directories
+        for directory in sorted(directories):
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.directories |= directories
+
+    def write(self, path, content):
+        # content is bytes, a str or an iterable of str chunks
+        temp_path, digest, _ = self.stage(path, content)
+        return self.commit(path, temp_path, digest)
+
+    def stage(self, path, content):
+        # Returns (temp path, digest, size), as write_temp
+        if isinstance(content, (bytes, str)):
+            content = [content]
+        self.make_dirs([path])
+        return write_temp(path, content, self.encoding)
+
+    def commit(self, path, temp_path, digest):
+        self.pending.acquire()
+        try:
+            future = self.executor.submit(self.commit_now, path, temp_path, digest)
+        except BaseException:
+            self.pending.release()
+            os.remove(temp_path)
+            raise
+        future.add_done_callback(lambda _: self.pending.release())
+        return future
+
+    def commit_now(self, path, temp_path, digest):
+        started = time.perf_counter()
+        try:
+            return commit_temp(path, temp_path, digest, self.state)
+        finally:
+            with self.profile_lock:
+                self.profile.add("write", time.perf_counter() - started)
+
+    def close(self):
+        # Wait for every pending write
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()